@@ -1,10 +1,23 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
-import joblib
-import plotly.express as px
 import plotly.graph_objects as go
 import warnings
+import uuid
+import os
+import io
+from scoring import (
+    load_artifacts, load_bootstrap, encode_form_data, get_risk_category, guardrail_score, apply_guardrails,
+    is_overridden, prediction_interval, effective_coefficients, DATASET_PATH, ATTENTION_THRESHOLD
+)
+from simulation import make_interventions, validate_cohort, run_simulation, summarize
+from shadow import PRODUCTION, load_candidates, assign_arm, score_vector, submit_shadow
+from figures import FIGURES_VERSION, dataset_fingerprint, build_dashboard_figures, serialize_figures, deserialize_figures
+from session_store import (
+    DEFAULT_FORM_DATA, EDUCATION_OPTIONS, SESSION_COOKIE, SESSION_TTL_SECONDS,
+    session_key, pack_record, unpack_record, save_record, load_record
+)
+from risk_table import load_table, score_with_table
 warnings.filterwarnings('ignore')
 
 st.set_page_config(
@@ -71,87 +84,115 @@ st.markdown("""
 # Load model (BAGIAN YANG DIPERBAIKI)
 @st.cache_resource
 def load_model():
+    return load_artifacts()
+
+# Versi file dataset (mtime, ukuran): cek murah tiap rerun agar cache di bawah ikut basi saat CSV diganti
+def dataset_version(path=DATASET_PATH):
     try:
-        model = joblib.load("logreg_model.pkl")
-        scaler = joblib.load("scaler.pkl")
-        feature_names = joblib.load("feature_names.pkl")
-        
-        # Coba load list fitur scaled, jika tidak ada, gunakan default list
-        # Ini mencegah error NameError
-        try:
-            scaled_features_list = joblib.load("scaled_features_list.pkl")
-        except:
-            # Default list fitur numerik yang biasanya discale
-            scaled_features_list = ["BMI", "MentHlth", "PhysHlth", "Age", "Education", "Income", "GenHlth"]
-            
-        return model, scaler, feature_names, scaled_features_list
-    except FileNotFoundError:
-        return None, None, None, None
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
 
-# Load dataset dashboard
-@st.cache_data
-def load_dataset():
+# Load dataset dashboard: df & fingerprint dari bytes yang sama, jadi selalu konsisten
+@st.cache_data(max_entries=1)
+def load_dataset(version):
     try:
-        return pd.read_csv("diabetes_binary_5050split_health_indicators_BRFSS2015.csv")
+        with open(DATASET_PATH, "rb") as f:
+            data = f.read()
+        return pd.read_csv(io.BytesIO(data)), dataset_fingerprint(data)
     except Exception as e:
         print(f"Error membaca file: {e}")
-        return None
+        return None, None
+
+# Figur dashboard: JSON di-cache per fingerprint dataset + tema (persist ke disk, dipakai semua sesi),
+# lalu objek Figure hasil decode disimpan sekali per proses agar rerun tidak membangun ulang figur.
+# Figur sendiri tidak bergantung tema (st.plotly_chart menerapkan tema aktif saat render).
+@st.cache_data(persist="disk", show_spinner=False)
+def dashboard_figures_json(fingerprint, theme, figures_version, _df):
+    figs, stats = build_dashboard_figures(_df)
+    return serialize_figures(figs), stats
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def dashboard_figures(fingerprint, theme, figures_version, _df):
+    fig_json, stats = dashboard_figures_json(fingerprint, theme, figures_version, _df)
+    return deserialize_figures(fig_json), stats
+
+def current_theme():
+    theme = getattr(st.context, "theme", None)
+    return (theme.type if theme is not None else None) or "light"
+
+# Ensemble koefisien bootstrap untuk interval ketidakpastian (opsional)
+@st.cache_resource
+def load_bootstrap_ensemble(_scaler, feature_names, scaled_features_list):
+    return load_bootstrap(scaler=_scaler, feature_names=feature_names, scaled_features_list=scaled_features_list)
+
+# Model produksi + kandidat shadow/A-B, semua dalam bentuk koefisien (w, b) ruang fitur mentah
+@st.cache_resource
+def load_scoring_models(_model, _scaler, feature_names, scaled_features_list):
+    candidates, ab_split = load_candidates(feature_names)
+    models = {PRODUCTION: effective_coefficients(_model, _scaler, feature_names, scaled_features_list)}
+    models.update(candidates)
+    return models, ab_split
+
+# Tabel lookup risiko hasil `python risk_table.py compile` (opsional)
+@st.cache_resource
+def load_risk_table(_model, _scaler, feature_names, scaled_features_list):
+    w, b = effective_coefficients(_model, _scaler, feature_names, scaled_features_list)
+    return load_table(w, b, feature_names)
 
 model, scaler, feature_names, scaled_features_list = load_model()
-df = load_dataset()
-
-#fungsi pembantu
-def map_age_to_ageg5yr(age):
-    if age < 25: return 1
-    elif age < 30: return 2
-    elif age < 35: return 3
-    elif age < 40: return 4
-    elif age < 45: return 5
-    elif age < 50: return 6
-    elif age < 55: return 7
-    elif age < 60: return 8
-    elif age < 65: return 9
-    elif age < 70: return 10
-    elif age < 75: return 11
-    elif age < 80: return 12
-    else: return 13
-
-def map_education(label):
-    mapping = {"SD": 2, "SMP": 3, "SMA": 4, "D3/S1": 5, "S2/S3": 6, "Tidak Sekolah/SD": 2, "Sarjana+": 6}
-    return mapping.get(label, 4)
-
-def map_income_rp(rp):
-    if rp < 15000000: return 1
-    elif rp < 25000000: return 2
-    elif rp < 35000000: return 3
-    elif rp < 50000000: return 4
-    elif rp < 75000000: return 5
-    elif rp < 100000000: return 6
-    elif rp < 150000000: return 7
-    else: return 8
-
-def get_risk_category(prob):
-    # Threshold disesuaikan agar lebih sensitif
-    if prob < 0.30: return "Sangat Rendah", "green", "😊"
-    elif prob < 0.50: return "Rendah", "lightgreen", "🙂"
-    elif prob < 0.70: return "Sedang", "orange", "😐"
-    elif prob < 0.85: return "Tinggi", "darkorange", "😕"
-    else: return "Sangat Tinggi", "red", "😞"
+df, dataset_fp = load_dataset(dataset_version())
+if model is not None:
+    boot_W, boot_b = load_bootstrap_ensemble(scaler, feature_names, scaled_features_list)
+    scoring_models, ab_split = load_scoring_models(model, scaler, feature_names, scaled_features_list)
+    risk_table = load_risk_table(model, scaler, feature_names, scaled_features_list)
+else:
+    boot_W, boot_b = None, None
+    scoring_models, ab_split = {}, {}
+    risk_table = None
 
 # Session State 
+if 'client_id' not in st.session_state:
+    # Wizard bisa dilanjutkan setelah reconnect / restart server. Key record terikat ke browser
+    # (cookie rahasia) + tab (id di URL), jadi link yang dibagikan tidak membuka data orang lain.
+    browser_id = st.context.cookies.get(SESSION_COOKIE)
+    if not browser_id:
+        browser_id = st.session_state.new_browser_id = uuid.uuid4().hex
+    tab_id = st.query_params.get("tab") or uuid.uuid4().hex[:8]
+    st.query_params["tab"] = tab_id
+    st.session_state.client_id = browser_id  # juga dipakai untuk A/B arm (tidak bisa dipilih lewat URL)
+    st.session_state.session_key = session_key(browser_id, tab_id)
+    restored = load_record(st.session_state.session_key)
+    if restored is not None:
+        # Jawaban & langkah dipulihkan, tapi hasil tidak langsung ditampilkan
+        _, st.session_state.current_step, _ = unpack_record(restored)
+        st.session_state.form_record = st.session_state.saved_record = restored
+        st.session_state.page = 'prediction'
+# Cookie cukup ditulis sekali per sesi baru
+if 'new_browser_id' in st.session_state:
+    st.html(
+        f"<script>document.cookie = '{SESSION_COOKIE}={st.session_state.pop('new_browser_id')}; "
+        f"max-age={SESSION_TTL_SECONDS}; path=/; SameSite=Strict';</script>",
+        unsafe_allow_javascript=True
+    )
 if 'page' not in st.session_state: st.session_state.page = 'dashboard'
 if 'current_step' not in st.session_state: st.session_state.current_step = 1
 if 'show_prediction' not in st.session_state: st.session_state.show_prediction = False
+if 'form_record' not in st.session_state: st.session_state.form_record = pack_record(DEFAULT_FORM_DATA)
+if 'saved_record' not in st.session_state: st.session_state.saved_record = st.session_state.form_record
 
-if 'form_data' not in st.session_state:
-    st.session_state.form_data = {
-        'age': 30, 'sex': 'Perempuan', 'weight': 60.0, 'height': 165.0, 'bmi': 22.0,
-        'HighBP': False, 'HighChol': False, 'CholCheck': False, 'Smoker': False,
-        'Stroke': False, 'HeartDiseaseorAttack': False, 'PhysActivity': False,
-        'DiffWalk': False, 'Fruits': False, 'Veggies': False, 'HvyAlcoholConsump': False,
-        'MentHlth': 0, 'PhysHlth': 0, 'GenHlth': 2, 'education': 'SMA',
-        'income': 30000000, 'AnyHealthcare': True, 'NoDocbcCost': False
-    }
+# Per sesi hanya record ringkas yang disimpan; form_data dibangun ulang tiap run
+form_data = unpack_record(st.session_state.form_record)[0]
+
+# Simpan ke store jika berubah sejak penyimpanan terakhir (setiap perubahan selalu diikuti st.rerun)
+st.session_state.form_record = pack_record(form_data, st.session_state.current_step, st.session_state.show_prediction)
+if st.session_state.form_record != st.session_state.saved_record:
+    save_record(st.session_state.session_key, st.session_state.form_record)
+    st.session_state.saved_record = st.session_state.form_record
+
+def update_form(values):
+    st.session_state.form_record = pack_record({**form_data, **values}, st.session_state.current_step, st.session_state.show_prediction)
 
 def next_step(): st.session_state.current_step += 1
 def prev_step(): st.session_state.current_step -= 1
@@ -159,18 +200,12 @@ def reset_form():
     st.session_state.current_step = 1
     st.session_state.show_prediction = False
     # Reset values to default
-    st.session_state.form_data = {
-        'age': 30, 'sex': 'Perempuan', 'weight': 60.0, 'height': 165.0, 'bmi': 22.0,
-        'HighBP': False, 'HighChol': False, 'CholCheck': False, 'Smoker': False,
-        'Stroke': False, 'HeartDiseaseorAttack': False, 'PhysActivity': False,
-        'DiffWalk': False, 'Fruits': False, 'Veggies': False, 'HvyAlcoholConsump': False,
-        'MentHlth': 0, 'PhysHlth': 0, 'GenHlth': 2, 'education': 'SMA',
-        'income': 30000000, 'AnyHealthcare': True, 'NoDocbcCost': False
-    }
+    st.session_state.form_record = pack_record(DEFAULT_FORM_DATA)
 
 def go_to_prediction(): st.session_state.page = 'prediction'; st.session_state.current_step = 1
 def go_to_dashboard(): st.session_state.page = 'dashboard'
 def go_to_limitations(): st.session_state.page = 'limitations'
+def go_to_simulation(): st.session_state.page = 'simulation'
 
 # SIDEBAR 
 with st.sidebar:
@@ -181,6 +216,8 @@ with st.sidebar:
         go_to_prediction(); st.rerun()
     if st.button("⚠️ Keterbatasan", use_container_width=True, type="primary" if st.session_state.page == 'limitations' else "secondary"):
         go_to_limitations(); st.rerun()
+    if st.button("🧪 Simulasi Intervensi", use_container_width=True, type="primary" if st.session_state.page == 'simulation' else "secondary"):
+        go_to_simulation(); st.rerun()
     st.title("ℹ️ Tentang Aplikasi")
     
     st.write("""
@@ -248,13 +285,15 @@ elif st.session_state.page == 'dashboard':
     st.caption("Analisis Data BRFSS 2015 (70,692 Responden)")
     
     if df is not None:
+        figs, stats = dashboard_figures(dataset_fp, current_theme(), FIGURES_VERSION, df)
+
         # KEY METRICS
         col1, col2, col3, col4 = st.columns(4)
         
-        total_responden = len(df)
-        diabetes_count = df['Diabetes_binary'].sum()
-        avg_bmi = df['BMI'].mean()
-        high_bp_rate = (df['HighBP'].sum() / total_responden) * 100
+        total_responden = stats['total_responden']
+        diabetes_count = stats['diabetes_count']
+        avg_bmi = stats['avg_bmi']
+        high_bp_rate = stats['high_bp_rate']
         
         with col1:
             st.metric("Total Responden", f"{total_responden:,}")
@@ -269,64 +308,14 @@ elif st.session_state.page == 'dashboard':
 
         # CHART UTAMA ---
         col_left, col_right = st.columns([1, 2])
-        color_map = {0: '#2a9d8f', 1: '#e76f51'}
         
         with col_left:
             # Donut Chart
-            diabetes_dist = df['Diabetes_binary'].value_counts()
-            fig_diabetes = go.Figure(data=[go.Pie(
-                labels=['Sehat', 'Diabetes'],
-                values=[diabetes_dist[0], diabetes_dist[1]],
-                hole=0.6,
-                marker=dict(colors=['#2a9d8f', '#e76f51']),
-                textinfo='percent',
-                hoverinfo='label+value'
-            )])
-            fig_diabetes.update_layout(
-                title=dict(text="Komposisi Dataset", font=dict(size=14)),
-                showlegend=True,
-                legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5),
-                margin=dict(t=40, b=0, l=0, r=0),
-                height=300,
-                paper_bgcolor='rgba(0,0,0,0)', 
-                plot_bgcolor='rgba(0,0,0,0)'
-            )
-            st.plotly_chart(fig_diabetes, use_container_width=True)
+            st.plotly_chart(figs['diabetes'], use_container_width=True)
         
         with col_right:
             # Horizontal Bar Chart
-            risk_data = {
-                'Tekanan Darah Tinggi': (df['HighBP'].sum() / total_responden) * 100,
-                'Kolesterol Tinggi': (df['HighChol'].sum() / total_responden) * 100,
-                'Perokok': (df['Smoker'].sum() / total_responden) * 100,
-                'Aktivitas Fisik Kurang': ((total_responden - df['PhysActivity'].sum()) / total_responden) * 100,
-                'Obesitas (BMI>30)': (len(df[df['BMI'] >= 30]) / total_responden) * 100
-            }
-            # Sort data
-            risk_sorted = dict(sorted(risk_data.items(), key=lambda item: item[1]))
-            
-            fig_risk = go.Figure(data=[go.Bar(
-                x=list(risk_sorted.values()),
-                y=list(risk_sorted.keys()),
-                orientation='h',
-                marker=dict(
-                    color='#457b9d', 
-                    opacity=0.9,
-                    line=dict(width=0)
-                ),
-                text=[f"{v:.1f}%" for v in risk_sorted.values()],
-                textposition='outside', 
-            )])
-            fig_risk.update_layout(
-                title=dict(text="Faktor Risiko Dominan (%)", font=dict(size=14)),
-                xaxis=dict(showgrid=False, showticklabels=False),
-                yaxis=dict(showgrid=False),
-                margin=dict(t=40, b=0, l=0, r=0),
-                height=300,
-                paper_bgcolor='rgba(0,0,0,0)', 
-                plot_bgcolor='rgba(0,0,0,0)'
-            )
-            st.plotly_chart(fig_risk, use_container_width=True)
+            st.plotly_chart(figs['risk'], use_container_width=True)
 
     
 
@@ -335,69 +324,14 @@ elif st.session_state.page == 'dashboard':
         col_chart1, col_chart2 = st.columns(2)
         
         with col_chart1:
-            fig_bmi = go.Figure()
-            fig_bmi.add_trace(go.Histogram(
-                x=df[df['Diabetes_binary'] == 0]['BMI'],
-                name='Sehat',
-                marker_color='#2a9d8f', opacity=0.6
-            ))
-            fig_bmi.add_trace(go.Histogram(
-                x=df[df['Diabetes_binary'] == 1]['BMI'],
-                name='Diabetes',
-                marker_color='#e76f51', opacity=0.6
-            ))
-            fig_bmi.update_layout(
-                title="Distribusi BMI (Berat Badan)",
-                barmode='overlay',
-                xaxis_title="Skor BMI",
-                yaxis_title="Jumlah Orang",
-                yaxis=dict(showgrid=True, gridcolor='rgba(128,128,128,0.2)'),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                legend=dict(x=0.75, y=0.9),
-                height=380
-            )
-            st.plotly_chart(fig_bmi, use_container_width=True)
+            st.plotly_chart(figs['bmi'], use_container_width=True)
             # Insight BMI
             st.info("ℹ️ **Insight:** Orang dengan BMI di atas 30 (Obesitas) memiliki populasi penderita diabetes (warna oranye) yang jauh lebih tebal dibanding BMI normal.")
 
         with col_chart2:
             # GRAFIK USIA-
-            
-            # Dictionary untuk menerjemahkan kode 1-13 ke Rentang Usia
-            age_map = {
-                1: "18-24 Thn", 2: "25-29 Thn", 3: "30-34 Thn", 4: "35-39 Thn", 5: "40-44 Thn",
-                6: "45-49 Thn", 7: "50-54 Thn", 8: "55-59 Thn", 9: "60-64 Thn", 10: "65-69 Thn",
-                11: "70-74 Thn", 12: "75-79 Thn", 13: "80+ Thn"
-            }
-            
-            # Hitung Rata-rata Risiko per Kategori Usia
-            age_risk = df.groupby('Age')['Diabetes_binary'].mean() * 100
-            
-            # Buat List Label agar urut sesuai index 1-13
-            age_labels = [age_map.get(x, str(x)) for x in age_risk.index]
-            
-            fig_age = go.Figure()
-            fig_age.add_trace(go.Scatter(
-                x=age_labels,    
-                y=age_risk.values,
-                mode='lines+markers',
-                line=dict(color='#e76f51', width=4, shape='spline'), 
-                marker=dict(size=10, color='white', line=dict(width=2, color='#e76f51')),
-                hovertemplate='<b>Usia: %{x}</b><br>Risiko Rata-rata: %{y:.1f}%<extra></extra>' 
-            ))
-            fig_age.update_layout(
-                title="Peningkatan Risiko Berdasarkan Usia",
-                xaxis_title="Kelompok Usia",
-                yaxis_title="Persentase Penderita Diabetes (%)",
-                yaxis=dict(showgrid=True, gridcolor='rgba(128,128,128,0.2)'),
-                xaxis=dict(tickangle=-45),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                height=380
-            )
-            st.plotly_chart(fig_age, use_container_width=True)
-            max_risk_age = age_labels[age_risk.argmax()]
+            st.plotly_chart(figs['age'], use_container_width=True)
+            max_risk_age = stats['max_risk_age']
             st.markdown(f"""
             <div style="background-color: rgba(231, 111, 81, 0.1); padding: 10px; border-radius: 8px; border-left: 4px solid #e76f51;">
                 <small><strong>📈 Analisis Tren:</strong> Grafik menunjukkan korelasi positif yang kuat antara usia dan diabetes. 
@@ -412,73 +346,13 @@ elif st.session_state.page == 'dashboard':
         col_life1, col_life2 = st.columns([1, 1])
 
         with col_life1:
-            # GenHlth: 1 (Excellent) -> 5 (Poor) Mapping Label agar mudah dibaca
-            health_labels = {1: "Sangat Baik", 2: "Baik Sekali", 3: "Baik", 4: "Cukup", 5: "Buruk"}
-            df['GenHlth_Label'] = df['GenHlth'].map(health_labels)
-            # Hitung proporsi
-            health_risk = df.groupby('GenHlth_Label')['Diabetes_binary'].mean().reset_index()
-            # Sort  (Sangat Baik -> Buruk)
-            sorter = ["Sangat Baik", "Baik Sekali", "Baik", "Cukup", "Buruk"]
-            health_risk['GenHlth_Label'] = pd.Categorical(health_risk['GenHlth_Label'], categories=sorter, ordered=True)
-            health_risk = health_risk.sort_values('GenHlth_Label')
-
-            fig_genhlth = go.Figure()
-            fig_genhlth.add_trace(go.Bar(
-                x=health_risk['GenHlth_Label'],
-                y=health_risk['Diabetes_binary'] * 100,
-                marker_color=['#2a9d8f', '#2a9d8f', '#e9c46a', '#f4a261', '#e76f51'],
-                text=[f"{v:.1f}%" for v in health_risk['Diabetes_binary'] * 100],
-                textposition='auto',
-            ))
-            fig_genhlth.update_layout(
-                title="Persentase Diabetes berdasarkan Persepsi Kesehatan",
-                xaxis_title="Persepsi Kesehatan Diri Sendiri",
-                yaxis_title="% Penderita Diabetes",
-                yaxis=dict(showgrid=False),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                height=350
-            )
-            st.plotly_chart(fig_genhlth, use_container_width=True)
+            st.plotly_chart(figs['genhlth'], use_container_width=True)
             
             st.info("🧠 **Fakta Menarik:** Responden yang merasa kesehatannya 'Buruk' memiliki prevalensi diabetes yang sangat tinggi (>40%), menunjukkan kesadaran diri yang kuat akan kondisi tubuh.")
 
         with col_life2:
             # 2. Dampak Kebiasaan Buruk vs Baik
-            habits = {
-                'Perokok Aktif': df[df['Smoker'] == 1]['Diabetes_binary'].mean(),
-                'Bukan Perokok': df[df['Smoker'] == 0]['Diabetes_binary'].mean(),
-                'Aktif Olahraga': df[df['PhysActivity'] == 1]['Diabetes_binary'].mean(),
-                'Jarang Olahraga': df[df['PhysActivity'] == 0]['Diabetes_binary'].mean(),
-                'Makan Sayur Tiap Hari': df[df['Veggies'] == 1]['Diabetes_binary'].mean(),
-                'Jarang Makan Sayur': df[df['Veggies'] == 0]['Diabetes_binary'].mean()
-            }
-            
-            # Ubah ke Dataframe untuk plotting
-            habit_df = pd.DataFrame(list(habits.items()), columns=['Kebiasaan', 'Risiko'])
-            habit_df['Risiko'] = habit_df['Risiko'] * 100
-            habit_df['Color'] = ['#e76f51', '#2a9d8f', '#2a9d8f', '#e76f51', '#2a9d8f', '#e76f51'] # Merah utk bad habit, Hijau utk good
-
-            fig_habit = go.Figure(go.Bar(
-                x=habit_df['Risiko'],
-                y=habit_df['Kebiasaan'],
-                orientation='h',
-                marker_color=habit_df['Color'],
-                text=[f"{v:.1f}%" for v in habit_df['Risiko']],
-                textposition='inside',
-                insidetextanchor='middle'
-            ))
-            
-            fig_habit.update_layout(
-                title="Perbandingan Risiko: Gaya Hidup Sehat vs Tidak",
-                xaxis_title="Persentase Penderita Diabetes (%)",
-                xaxis=dict(showgrid=True, gridcolor='rgba(128,128,128,0.2)'),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                height=350,
-                margin=dict(l=10)
-            )
-            st.plotly_chart(fig_habit, use_container_width=True)
+            st.plotly_chart(figs['habit'], use_container_width=True)
             
             st.info("🏃‍♂️ **Insight:** Kurang olahraga (Sedentary Lifestyle) menjadi faktor risiko gaya hidup terbesar, bahkan dampaknya terlihat lebih signifikan dibandingkan pola makan sayur.")
 
@@ -487,38 +361,7 @@ elif st.session_state.page == 'dashboard':
         #  MENTAL & PHYSICAL HEALTH DAYS
         st.subheader("📅 Kualitas Hidup Bulanan")
         # Rata-rata hari sakit fisik & mental dalam 30 hari terakhir
-        avg_health_days = df.groupby('Diabetes_binary')[['PhysHlth', 'MentHlth']].mean().reset_index()
-        fig_days = go.Figure()
-        # Bar Kesehatan Fisik
-        fig_days.add_trace(go.Bar(
-            name='Hari Sakit Fisik',
-            x=['Non-Diabetes', 'Diabetes'],
-            y=avg_health_days['PhysHlth'],
-            marker_color='#457b9d',
-            text=[f"{v:.1f} Hari" for v in avg_health_days['PhysHlth']],
-            textposition='auto'
-        ))
-        
-        # Bar Kesehatan Mental
-        fig_days.add_trace(go.Bar(
-            name='Hari Terganggu Mental',
-            x=['Non-Diabetes', 'Diabetes'],
-            y=avg_health_days['MentHlth'],
-            marker_color='#a8dadc',
-            text=[f"{v:.1f} Hari" for v in avg_health_days['MentHlth']],
-            textposition='auto'
-        ))
-
-        fig_days.update_layout(
-            title="Rata-rata Jumlah Hari 'Kurang Sehat' dalam Sebulan (30 Hari)",
-            yaxis_title="Jumlah Hari",
-            barmode='group', # Grouped bar chart
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-            height=300
-        )
-        st.plotly_chart(fig_days, use_container_width=True)
+        st.plotly_chart(figs['days'], use_container_width=True)
 
     
 
@@ -529,49 +372,14 @@ elif st.session_state.page == 'dashboard':
             st.caption("Analisis statistik untuk melihat hubungan sebab-akibat antar faktor risiko.")
 
             # HEATMAP
-            selected_features = ['Diabetes_binary', 'HighBP', 'HighChol', 'BMI', 'Age', 'GenHlth', 'DiffWalk', 'HeartDiseaseorAttack']
-            
-            rename_map = {
-                'Diabetes_binary': 'Diabetes',
-                'HighBP': 'Darah Tinggi',
-                'HighChol': 'Kolesterol',
-                'GenHlth': 'Kesehatan Umum',
-                'DiffWalk': 'Susah Jalan',
-                'HeartDiseaseorAttack': 'Sakit Jantung',
-                'Age': 'Usia'
-            }
-            
-            corr_df = df[selected_features].rename(columns=rename_map).corr()
-            
-            # Buat Heatmap
-            fig_corr = px.imshow(
-                corr_df,
-                text_auto='.2f', 
-                aspect="auto",
-                color_continuous_scale='RdBu_r', 
-                origin='lower'
-            )
-            
-            fig_corr.update_layout(
-                title="Matriks Korelasi (Warna Merah = Hubungan Kuat)",
-                margin=dict(t=30, l=0, r=0, b=0),
-                height=350, 
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                coloraxis_showscale=False
-            )
-            st.plotly_chart(fig_corr, use_container_width=True)
+            st.plotly_chart(figs['corr'], use_container_width=True)
             st.markdown("##### 💡 Insight & Kesimpulan")
             
-            # Logika Interpretasi
-            corr_target = corr_df['Diabetes'].drop('Diabetes')
-            top_3 = corr_target.sort_values(ascending=False).head(3)
-
             # Grid untuk insight
             col_insight1, col_insight2 = st.columns(2)
 
             with col_insight1:
-                st.info(f"**Faktor Utama:**\n\nAnalisis menunjukkan bahwa **{top_3.index[0]}** adalah indikator terkuat (Koefisien: {top_3.values[0]:.2f}). Jika pasien memiliki kondisi ini, risiko diabetes melonjak drastis.")
+                st.info(f"**Faktor Utama:**\n\nAnalisis menunjukkan bahwa **{stats['top_factor']}** adalah indikator terkuat (Koefisien: {stats['top_factor_corr']:.2f}). Jika pasien memiliki kondisi ini, risiko diabetes melonjak drastis.")
 
             with col_insight2:
                 st.warning(f"**Pola Komorbiditas:**\n\nTerlihat hubungan erat antara **Darah Tinggi** dan **Kolesterol**. Kedua penyakit ini sering menyerang bersamaan, memperburuk kondisi pasien secara eksponensial.")
@@ -592,6 +400,72 @@ elif st.session_state.page == 'dashboard':
 
     else:
         st.error("Dataset tidak ditemukan.")
+elif st.session_state.page == 'simulation':
+    st.markdown('<p class="main-header">🧪 Simulasi Intervensi Populasi</p>', unsafe_allow_html=True)
+    st.caption("Simulasi Monte Carlo: terapkan intervensi acak ke populasi, lalu hitung ulang risiko lewat model + clinical guardrails.")
+
+    uploaded = st.file_uploader("Upload kohort (CSV dengan kolom fitur BRFSS)", type="csv")
+    cohort, cohort_error, n_dropped = df, None, 0
+    if uploaded is not None:
+        try:
+            cohort = pd.read_csv(uploaded)
+        except Exception as e:
+            cohort, cohort_error = None, f"Gagal membaca CSV: {e}"
+    if cohort is not None and model is not None:
+        try:
+            cohort, n_dropped = validate_cohort(cohort, feature_names)
+        except ValueError as e:
+            cohort, cohort_error = None, str(e)
+
+    if model is None:
+        st.error("Model AI belum dimuat. Jalankan train_model.py dulu.")
+    elif cohort_error:
+        st.error(cohort_error)
+    elif cohort is None:
+        st.error("Dataset tidak ditemukan.")
+    elif len(cohort) == 0:
+        st.error("Kohort tidak memiliki baris yang valid.")
+    else:
+        st.write(f"Populasi: **{len(cohort):,}** orang")
+        if n_dropped:
+            st.warning(f"{n_dropped:,} baris dengan nilai kosong/non-numerik/di luar rentang diabaikan.")
+        c1, c2 = st.columns(2)
+        quit_smoking = c1.slider("Perokok yang berhenti (%)", 0, 100, 20) / 100
+        adopt_activity = c2.slider("Orang tidak aktif yang mulai olahraga (%)", 0, 100, 0) / 100
+        c1, c2 = st.columns(2)
+        bmi_shift = c1.slider("Perubahan BMI rata-rata", -5.0, 5.0, -2.0, 0.5)
+        bmi_sd = c2.slider("Variasi perubahan BMI (SD)", 0.0, 3.0, 1.0, 0.5)
+        n_replicates = st.number_input("Jumlah replikasi", 10, 1000, 100, step=10)
+
+        if st.button("▶️ Jalankan Simulasi", type="primary"):
+            interventions = make_interventions(
+                quit={'Smoker': quit_smoking}, adopt={'PhysActivity': adopt_activity}, shift={'BMI': (bmi_shift, bmi_sd)}
+            )
+            with st.spinner("Menjalankan simulasi..."):
+                baseline, counts = run_simulation(
+                    cohort, interventions, model, scaler, feature_names, scaled_features_list,
+                    n_replicates=int(n_replicates)
+                )
+            summary = summarize(baseline, counts)
+            st.dataframe(summary.round(1), use_container_width=True, hide_index=True)
+
+            fig_sim = go.Figure()
+            for i, name in enumerate(summary['Kategori'][:-1]):
+                fig_sim.add_trace(go.Box(y=counts[:, i], name=name, boxpoints=False))
+            fig_sim.update_layout(
+                title="Distribusi Jumlah Orang per Kategori Risiko (antar replikasi)",
+                yaxis_title="Jumlah Orang",
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)',
+                showlegend=False,
+                height=380
+            )
+            st.plotly_chart(fig_sim, use_container_width=True)
+
+            high_risk = summary.iloc[-1]
+            st.info(f"📉 Perkiraan perubahan jumlah orang berisiko tinggi: **{high_risk['Selisih']:+,.0f}** "
+                    f"(interval 95%: {high_risk['P2.5'] - high_risk['Baseline']:+,.0f} s/d {high_risk['P97.5'] - high_risk['Baseline']:+,.0f})")
+
 elif st.session_state.page == 'prediction':
     st.markdown('<p class="main-header">🩺 Estimasi Risiko Diabetes</p>', unsafe_allow_html=True)
     
@@ -602,18 +476,18 @@ elif st.session_state.page == 'prediction':
     # DATA PRIBADI
     if st.session_state.current_step == 1:
         st.subheader("1️⃣ Data Pribadi")
-        age = st.number_input("Umur", 18, 100, st.session_state.form_data['age'])
-        sex = st.radio("Jenis Kelamin", ["Perempuan", "Laki-laki"], index=0 if st.session_state.form_data['sex'] == "Perempuan" else 1)
+        age = st.number_input("Umur", 18, 100, form_data['age'])
+        sex = st.radio("Jenis Kelamin", ["Perempuan", "Laki-laki"], index=0 if form_data['sex'] == "Perempuan" else 1)
         
         c1, c2 = st.columns(2)
-        weight = c1.number_input("Berat (kg)", 30.0, 200.0, st.session_state.form_data['weight'])
-        height = c2.number_input("Tinggi (cm)", 100.0, 250.0, st.session_state.form_data['height'])
+        weight = c1.number_input("Berat (kg)", 30.0, 200.0, form_data['weight'])
+        height = c2.number_input("Tinggi (cm)", 100.0, 250.0, form_data['height'])
         
         bmi = weight / ((height/100)**2)
         st.info(f"📐 BMI Anda: **{bmi:.1f}** ({'Normal' if 18.5 <= bmi < 25 else 'Obesitas' if bmi >= 30 else 'Perlu Perhatian'})")
         
         if st.button("Lanjut →", use_container_width=True):
-            st.session_state.form_data.update({'age':age, 'sex':sex, 'weight':weight, 'height':height, 'bmi':bmi})
+            update_form({'age':age, 'sex':sex, 'weight':weight, 'height':height, 'bmi':bmi})
             next_step(); st.rerun()
 
     # RIWAYAT KESEHATAN 
@@ -623,46 +497,46 @@ elif st.session_state.page == 'prediction':
         
         c1, c2 = st.columns(2)
         with c1:
-            HighBP = st.checkbox("Tekanan Darah Tinggi", st.session_state.form_data['HighBP'])
-            HighChol = st.checkbox("Kolesterol Tinggi", st.session_state.form_data['HighChol'])
-            CholCheck = st.checkbox("Cek Kolesterol (5 thn terakhir)", st.session_state.form_data['CholCheck'])
-            Stroke = st.checkbox("Pernah Stroke", st.session_state.form_data['Stroke'])
+            HighBP = st.checkbox("Tekanan Darah Tinggi", form_data['HighBP'])
+            HighChol = st.checkbox("Kolesterol Tinggi", form_data['HighChol'])
+            CholCheck = st.checkbox("Cek Kolesterol (5 thn terakhir)", form_data['CholCheck'])
+            Stroke = st.checkbox("Pernah Stroke", form_data['Stroke'])
         with c2:
-            HeartDiseaseorAttack = st.checkbox("Penyakit Jantung / Serangan Jantung", st.session_state.form_data['HeartDiseaseorAttack'])
-            DiffWalk = st.checkbox("Kesulitan Berjalan / Naik Tangga", st.session_state.form_data['DiffWalk'])
+            HeartDiseaseorAttack = st.checkbox("Penyakit Jantung / Serangan Jantung", form_data['HeartDiseaseorAttack'])
+            DiffWalk = st.checkbox("Kesulitan Berjalan / Naik Tangga", form_data['DiffWalk'])
         
         st.markdown("---")
-        GenHlth = st.select_slider("Bagaimana kondisi kesehatan Anda secara umum?", options=[1,2,3,4,5], value=st.session_state.form_data['GenHlth'],
+        GenHlth = st.select_slider("Bagaimana kondisi kesehatan Anda secara umum?", options=[1,2,3,4,5], value=form_data['GenHlth'],
                                    format_func=lambda x: {1:"Sangat Baik", 2:"Baik", 3:"Cukup", 4:"Buruk", 5:"Sangat Buruk"}[x])
         
         c1, c2 = st.columns(2)
-        MentHlth = c1.slider("Hari Stres/Depresi (30 hari terakhir)", 0, 30, st.session_state.form_data['MentHlth'])
-        PhysHlth = c2.slider("Hari Sakit Fisik (30 hari terakhir)", 0, 30, st.session_state.form_data['PhysHlth'])
+        MentHlth = c1.slider("Hari Stres/Depresi (30 hari terakhir)", 0, 30, form_data['MentHlth'])
+        PhysHlth = c2.slider("Hari Sakit Fisik (30 hari terakhir)", 0, 30, form_data['PhysHlth'])
         
         c1, c2 = st.columns(2)
         if c1.button("← Kembali", use_container_width=True): prev_step(); st.rerun()
         if c2.button("Lanjut →", use_container_width=True):
-            st.session_state.form_data.update({'HighBP':HighBP, 'HighChol':HighChol, 'CholCheck':CholCheck, 'Stroke':Stroke, 'HeartDiseaseorAttack':HeartDiseaseorAttack, 'DiffWalk':DiffWalk, 'GenHlth':GenHlth, 'MentHlth':MentHlth, 'PhysHlth':PhysHlth})
+            update_form({'HighBP':HighBP, 'HighChol':HighChol, 'CholCheck':CholCheck, 'Stroke':Stroke, 'HeartDiseaseorAttack':HeartDiseaseorAttack, 'DiffWalk':DiffWalk, 'GenHlth':GenHlth, 'MentHlth':MentHlth, 'PhysHlth':PhysHlth})
             next_step(); st.rerun()
 
     # GAYA HIDUP 
     elif st.session_state.current_step == 3:
         st.subheader("3️⃣ Kebiasaan & Gaya Hidup")
         
-        PhysActivity = st.checkbox("Olahraga Rutin (Min. 30 menit/hari)", st.session_state.form_data['PhysActivity'])
+        PhysActivity = st.checkbox("Olahraga Rutin (Min. 30 menit/hari)", form_data['PhysActivity'])
         c1, c2 = st.columns(2)
-        Fruits = c1.checkbox("Makan Buah Tiap Hari", st.session_state.form_data['Fruits'])
-        Veggies = c2.checkbox("Makan Sayur Tiap Hari", st.session_state.form_data['Veggies'])
+        Fruits = c1.checkbox("Makan Buah Tiap Hari", form_data['Fruits'])
+        Veggies = c2.checkbox("Makan Sayur Tiap Hari", form_data['Veggies'])
         
         st.markdown("---")
         c1, c2 = st.columns(2)
-        Smoker = c1.checkbox("Perokok Aktif (Min. 100 batang seumur hidup)", st.session_state.form_data['Smoker'])
-        HvyAlcoholConsump = c2.checkbox("Minum Alkohol Berlebihan", st.session_state.form_data['HvyAlcoholConsump'])
+        Smoker = c1.checkbox("Perokok Aktif (Min. 100 batang seumur hidup)", form_data['Smoker'])
+        HvyAlcoholConsump = c2.checkbox("Minum Alkohol Berlebihan", form_data['HvyAlcoholConsump'])
         
         c1, c2 = st.columns(2)
         if c1.button("← Kembali", use_container_width=True): prev_step(); st.rerun()
         if c2.button("Lanjut →", use_container_width=True):
-            st.session_state.form_data.update({'PhysActivity':PhysActivity, 'Fruits':Fruits, 'Veggies':Veggies, 'Smoker':Smoker, 'HvyAlcoholConsump':HvyAlcoholConsump})
+            update_form({'PhysActivity':PhysActivity, 'Fruits':Fruits, 'Veggies':Veggies, 'Smoker':Smoker, 'HvyAlcoholConsump':HvyAlcoholConsump})
             next_step(); st.rerun()
 
     # SOSIAL & HASIL
@@ -670,18 +544,19 @@ elif st.session_state.page == 'prediction':
         if not st.session_state.show_prediction:
             st.subheader("4️⃣ Faktor Sosial & Ekonomi")
             
-            education = st.selectbox("Pendidikan Terakhir", ["SD", "SMP", "SMA", "D3/S1", "S2/S3"], index=2)
-            income = st.number_input("Pendapatan Tahunan (Rp)", 0, 1000000000, int(st.session_state.form_data['income']), step=1000000)
+            education = st.selectbox("Pendidikan Terakhir", EDUCATION_OPTIONS, index=EDUCATION_OPTIONS.index(form_data['education']))
+            income = st.number_input("Pendapatan Tahunan (Rp)", 0, 1000000000, int(form_data['income']), step=1000000)
             
             c1, c2 = st.columns(2)
-            AnyHealthcare = c1.checkbox("Punya Akses Layanan Kesehatan / BPJS", st.session_state.form_data['AnyHealthcare'])
-            NoDocbcCost = c2.checkbox("Pernah Batal ke Dokter karena Biaya", st.session_state.form_data['NoDocbcCost'])
+            AnyHealthcare = c1.checkbox("Punya Akses Layanan Kesehatan / BPJS", form_data['AnyHealthcare'])
+            NoDocbcCost = c2.checkbox("Pernah Batal ke Dokter karena Biaya", form_data['NoDocbcCost'])
             
             c1, c2 = st.columns(2)
             if c1.button("← Kembali", use_container_width=True): prev_step(); st.rerun()
             if c2.button("🔍 Analisis Risiko Sekarang", use_container_width=True, type="primary"):
-                st.session_state.form_data.update({'education':education, 'income':income, 'AnyHealthcare':AnyHealthcare, 'NoDocbcCost':NoDocbcCost})
+                update_form({'education':education, 'income':income, 'AnyHealthcare':AnyHealthcare, 'NoDocbcCost':NoDocbcCost})
                 st.session_state.show_prediction = True
+                st.session_state.request_id = uuid.uuid4().hex
                 st.rerun()
         
         else:
@@ -692,19 +567,8 @@ elif st.session_state.page == 'prediction':
                 st.error("Model AI belum dimuat. Jalankan train_model.py dulu.")
             else:
                 # Persiapan Data
-                fd = st.session_state.form_data
-                input_data = {
-                    "HighBP": int(fd['HighBP']), "HighChol": int(fd['HighChol']), "CholCheck": int(fd['CholCheck']),
-                    "BMI": fd['bmi'], "Smoker": int(fd['Smoker']), "Stroke": int(fd['Stroke']),
-                    "HeartDiseaseorAttack": int(fd['HeartDiseaseorAttack']), "PhysActivity": int(fd['PhysActivity']),
-                    "Fruits": int(fd['Fruits']), "Veggies": int(fd['Veggies']), "HvyAlcoholConsump": int(fd['HvyAlcoholConsump']),
-                    "AnyHealthcare": int(fd['AnyHealthcare']), "NoDocbcCost": int(fd['NoDocbcCost']),
-                    "GenHlth": fd['GenHlth'], "MentHlth": fd['MentHlth'], "PhysHlth": fd['PhysHlth'],
-                    "DiffWalk": int(fd['DiffWalk']), "Sex": 1 if fd['sex'] == "Laki-laki" else 0,
-                    "Age": map_age_to_ageg5yr(fd['age']),
-                    "Education": map_education(fd['education']),
-                    "Income": map_income_rp(fd['income'])
-                }
+                fd = form_data
+                input_data = encode_form_data(fd)
                 
                 # DataFrame & Scaling
                 X_input = pd.DataFrame([input_data])
@@ -717,42 +581,37 @@ elif st.session_state.page == 'prediction':
                     except Exception as e:
                         st.warning(f"Note Scaling: {e}")
 
+                # Vektor fitur mentah, dipakai bersama oleh bootstrap & model shadow/A-B
+                x_raw = np.array([input_data[f] for f in (feature_names or list(input_data))], dtype=float)
+                risk_score = int(guardrail_score(input_data))
+                arm = assign_arm(st.session_state.client_id, ab_split)
+
                 # 3. Prediksi Awal
-                raw_prob = model.predict_proba(X_input)[0][1]
-                risk_score = 0
-                
-                # Faktor Kritis (Bobot Besar)
-                if input_data['HighBP'] == 1: risk_score += 2
-                if input_data['HighChol'] == 1: risk_score += 2
-                if input_data['BMI'] >= 30: risk_score += 3 
-                elif input_data['BMI'] >= 25: risk_score += 1 
-                if input_data['HeartDiseaseorAttack'] == 1: risk_score += 3
-                if input_data['Stroke'] == 1: risk_score += 3
-                
-                # Faktor Tambahan
-                if input_data['GenHlth'] >= 4: risk_score += 2 
-                if input_data['DiffWalk'] == 1: risk_score += 1
-                if input_data['Age'] >= 9: risk_score += 1 
-
-                # Logika Override Probabilitas
-                final_prob = raw_prob
-                override_msg = ""
-                
-                if risk_score >= 6: # Sangat Berbahaya 
-                    final_prob = max(raw_prob, 0.86) # Paksa ke Sangat Tinggi
-                    override_msg = "⚠️ Risiko dikoreksi naik karena komplikasi multi-faktor."
-                elif risk_score >= 4: # Berbahaya
-                    final_prob = max(raw_prob, 0.72) 
-                elif risk_score >= 2: # Waspada
-                    final_prob = max(raw_prob, 0.55)
-                
+                if arm == PRODUCTION and risk_table is not None:
+                    raw_prob, _ = score_with_table(risk_table, input_data)
+                elif arm == PRODUCTION:
+                    raw_prob = model.predict_proba(X_input)[0][1]
+                else:
+                    raw_prob, _ = score_vector(x_raw, *scoring_models[arm], risk_score)
+
+                # Logika Override Probabilitas (lihat GUARDRAIL_FLOORS di scoring.py)
+                final_prob = float(apply_guardrails(raw_prob, risk_score))
+                override_msg = "⚠️ Risiko dikoreksi naik karena komplikasi multi-faktor." if is_overridden(risk_score) else ""
+
+                # Interval 95% dari ensemble bootstrap (satu perkalian matriks-vektor)
+                interval_msg = ""
+                if boot_W is not None and arm == PRODUCTION:
+                    lower, upper = prediction_interval(x_raw, boot_W, boot_b, risk_score)
+                    interval_msg = f"Interval 95%: {lower:.1%} – {upper:.1%}"
+
                 # Tampilkan Hasil
                 label, color, icon = get_risk_category(final_prob)
-                
+
                 st.markdown(f"""
                 <div class="result-card" style="border-top: 5px solid {color};">
                     <h2 style="color: {color}; margin: 0;">{icon} Risiko {label}</h2>
                     <h1 style="font-size: 3.5rem; margin: 10px 0;">{final_prob:.1%}</h1>
+                    {f'<p style="color: #666; margin-top: -5px;">{interval_msg}</p>' if interval_msg else ''}
                     <div style="background: #eee; height: 10px; border-radius: 5px; width: 100%;">
                         <div style="background: {color}; width: {final_prob*100}%; height: 100%; border-radius: 5px;"></div>
                     </div>
@@ -760,12 +619,17 @@ elif st.session_state.page == 'prediction':
                     {f'<p style="color: #e67e22; font-size: 0.9rem;">{override_msg}</p>' if override_msg else ''}
                 </div>
                 """, unsafe_allow_html=True)
+
+                # Shadow scoring di thread latar belakang, sekali per analisis (bukan per rerun)
+                if st.session_state.get('shadow_logged') != st.session_state.get('request_id'):
+                    submit_shadow(st.session_state.request_id, arm, x_raw, risk_score, final_prob, scoring_models)
+                    st.session_state.shadow_logged = st.session_state.request_id
                 
                 # Rekomendasi
                 c1, c2 = st.columns([3, 2])
                 with c1:
                     st.subheader("📝 Saran Kesehatan")
-                    if final_prob > 0.5:
+                    if final_prob >= ATTENTION_THRESHOLD:
                         st.error("""
                         **PERHATIAN MEDIS DIPERLUKAN:**
                         1. Segera cek **Gula Darah Puasa** & **HbA1c**.
@@ -0,0 +1,56 @@
+"""Ukur biaya figur dashboard per rerun: tanpa cache vs dengan cache figur.
+
+    python bench_dashboard.py --repeat 20
+
+"Tanpa cache" = bangun semua figur dari dataset lalu serialisasi (perilaku lama tiap rerun).
+"Dengan cache" = figur sudah ada di cache, hanya kerja yang tetap dilakukan st.plotly_chart.
+"""
+import argparse
+import statistics
+import time
+
+import pandas as pd
+import plotly.io as pio
+import plotly.tools
+
+from figures import build_dashboard_figures, serialize_figures, deserialize_figures
+from scoring import DATASET_PATH
+
+
+def _plotly_chart_work(figs):
+    # Yang dikerjakan st.plotly_chart untuk tiap figur: validasi ringan + to_json
+    for fig in figs.values():
+        figure = plotly.tools.return_figure_from_figure_or_data(fig, validate_figure=True)
+        pio.to_json(figure, validate=False)
+
+
+def _timeit(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cache figur dashboard")
+    parser.add_argument("--data", default=DATASET_PATH)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data)
+    build_dashboard_figures(df)  # pemanasan (import & template plotly)
+
+    uncached = _timeit(lambda: _plotly_chart_work(build_dashboard_figures(df)[0]), args.repeat)
+    cold = _timeit(lambda: deserialize_figures(serialize_figures(build_dashboard_figures(df)[0])), 1)
+    figs = deserialize_figures(serialize_figures(build_dashboard_figures(df)[0]))
+    cached = _timeit(lambda: _plotly_chart_work(figs), args.repeat)
+
+    print(f"Tanpa cache (per rerun)      : {uncached:8.1f} ms")
+    print(f"Isi cache (sekali per proses): {cold:8.1f} ms")
+    print(f"Dengan cache (per rerun)     : {cached:8.1f} ms  ({cached / uncached:.1%} dari sebelumnya)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Buat ensemble koefisien bootstrap (B x 21) untuk interval ketidakpastian prediksi.
+
+    python bootstrap_coefficients.py --replicates 200 --workers 8
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+
+from scoring import DATASET_PATH, BOOTSTRAP_PATH, load_artifacts
+
+
+_worker_data = None
+
+def _init_worker(data):
+    global _worker_data
+    _worker_data = data
+
+def _fit_replicate(seed):
+    # Resample baris dengan pengembalian lalu fit ulang (hyperparameter & scaler produksi yang sama)
+    X, y, estimator = _worker_data
+    idx = np.random.default_rng(seed).integers(0, len(y), len(y))
+    model = clone(estimator).fit(X[idx], y[idx])
+    return model.coef_[0], model.intercept_[0]
+
+
+def bootstrap(df, model, scaler, feature_names, scaled_features_list, n_replicates=200, seed=42, workers=1):
+    X = df[feature_names].copy()
+    cols_to_scale = [c for c in scaled_features_list if c in X.columns]
+    X[cols_to_scale] = scaler.transform(X[cols_to_scale])
+    data = (X.to_numpy(dtype=float), df["Diabetes_binary"].to_numpy(dtype=int), clone(model))
+
+    seeds = np.random.SeedSequence(seed).spawn(n_replicates)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,)) as ex:
+            results = list(ex.map(_fit_replicate, seeds))
+    else:
+        _init_worker(data)
+        results = [_fit_replicate(s) for s in seeds]
+    coef = np.vstack([c for c, _ in results])
+    intercept = np.array([b for _, b in results])
+    return coef, intercept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bootstrap refit koefisien logistic regression")
+    parser.add_argument("--data", default=DATASET_PATH)
+    parser.add_argument("--replicates", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", default=BOOTSTRAP_PATH)
+    args = parser.parse_args()
+
+    model, scaler, feature_names, scaled_features_list = load_artifacts()
+    if model is None:
+        raise SystemExit("Model tidak ditemukan.")
+    df = pd.read_csv(args.data)
+    coef, intercept = bootstrap(
+        df, model, scaler, feature_names, scaled_features_list,
+        n_replicates=args.replicates, seed=args.seed, workers=args.workers
+    )
+    # Simpan juga fitur & scaler yang dipakai, agar app bisa menolak file yang sudah basi
+    np.savez(
+        args.output, coef=coef, intercept=intercept,
+        feature_names=np.array(feature_names), scaled_features_list=np.array(scaled_features_list),
+        scaler_mean=scaler.mean_, scaler_scale=scaler.scale_
+    )
+    print(f"{coef.shape[0]} set koefisien disimpan ke {args.output}")
+
+
+if __name__ == "__main__":
+    main()
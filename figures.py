@@ -0,0 +1,296 @@
+"""Figur Plotly statis untuk dashboard.
+
+Figur hanya bergantung pada dataset, jadi app.py men-cache hasil serialisasinya per
+fingerprint dataset + tema + FIGURES_VERSION. Dataset & fingerprint dibaca ulang saat
+mtime/ukuran file berubah, sehingga dataset baru terbaca tanpa restart.
+Ukur dampaknya dengan: python bench_dashboard.py
+"""
+import hashlib
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+AGE_MAP = {
+    1: "18-24 Thn", 2: "25-29 Thn", 3: "30-34 Thn", 4: "35-39 Thn", 5: "40-44 Thn",
+    6: "45-49 Thn", 7: "50-54 Thn", 8: "55-59 Thn", 9: "60-64 Thn", 10: "65-69 Thn",
+    11: "70-74 Thn", 12: "75-79 Thn", 13: "80+ Thn"
+}
+HEALTH_LABELS = {1: "Sangat Baik", 2: "Baik Sekali", 3: "Baik", 4: "Cukup", 5: "Buruk"}
+
+# Naikkan setiap kali build_dashboard_figures berubah: cache JSON di disk hanya meng-hash
+# kode fungsi pemanggil di app.py, jadi tanpa ini figur lama tetap dipakai setelah restart
+FIGURES_VERSION = 1
+
+
+def dataset_fingerprint(data):
+    # Hash isi file dataset (bytes) -> key cache figur
+    return hashlib.sha256(data).hexdigest()
+
+
+def build_dashboard_figures(df):
+    """Bangun semua figur dashboard + angka ringkasan untuk teks insight.
+
+    Return (figs, stats): figs = {nama: go.Figure}, stats = dict nilai JSON-able.
+    """
+    figs = {}
+    total_responden = len(df)
+    stats = {
+        "total_responden": total_responden,
+        "diabetes_count": int(df['Diabetes_binary'].sum()),
+        "avg_bmi": float(df['BMI'].mean()),
+        "high_bp_rate": float((df['HighBP'].sum() / total_responden) * 100),
+    }
+
+    # Donut Chart
+    diabetes_dist = df['Diabetes_binary'].value_counts()
+    fig_diabetes = go.Figure(data=[go.Pie(
+        labels=['Sehat', 'Diabetes'],
+        values=[diabetes_dist[0], diabetes_dist[1]],
+        hole=0.6,
+        marker=dict(colors=['#2a9d8f', '#e76f51']),
+        textinfo='percent',
+        hoverinfo='label+value'
+    )])
+    fig_diabetes.update_layout(
+        title=dict(text="Komposisi Dataset", font=dict(size=14)),
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5),
+        margin=dict(t=40, b=0, l=0, r=0),
+        height=300,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    figs['diabetes'] = fig_diabetes
+
+    # Horizontal Bar Chart
+    risk_data = {
+        'Tekanan Darah Tinggi': (df['HighBP'].sum() / total_responden) * 100,
+        'Kolesterol Tinggi': (df['HighChol'].sum() / total_responden) * 100,
+        'Perokok': (df['Smoker'].sum() / total_responden) * 100,
+        'Aktivitas Fisik Kurang': ((total_responden - df['PhysActivity'].sum()) / total_responden) * 100,
+        'Obesitas (BMI>30)': (len(df[df['BMI'] >= 30]) / total_responden) * 100
+    }
+    # Sort data
+    risk_sorted = dict(sorted(risk_data.items(), key=lambda item: item[1]))
+
+    fig_risk = go.Figure(data=[go.Bar(
+        x=list(risk_sorted.values()),
+        y=list(risk_sorted.keys()),
+        orientation='h',
+        marker=dict(
+            color='#457b9d',
+            opacity=0.9,
+            line=dict(width=0)
+        ),
+        text=[f"{v:.1f}%" for v in risk_sorted.values()],
+        textposition='outside',
+    )])
+    fig_risk.update_layout(
+        title=dict(text="Faktor Risiko Dominan (%)", font=dict(size=14)),
+        xaxis=dict(showgrid=False, showticklabels=False),
+        yaxis=dict(showgrid=False),
+        margin=dict(t=40, b=0, l=0, r=0),
+        height=300,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    figs['risk'] = fig_risk
+
+    # Distribusi BMI
+    fig_bmi = go.Figure()
+    fig_bmi.add_trace(go.Histogram(
+        x=df[df['Diabetes_binary'] == 0]['BMI'],
+        name='Sehat',
+        marker_color='#2a9d8f', opacity=0.6
+    ))
+    fig_bmi.add_trace(go.Histogram(
+        x=df[df['Diabetes_binary'] == 1]['BMI'],
+        name='Diabetes',
+        marker_color='#e76f51', opacity=0.6
+    ))
+    fig_bmi.update_layout(
+        title="Distribusi BMI (Berat Badan)",
+        barmode='overlay',
+        xaxis_title="Skor BMI",
+        yaxis_title="Jumlah Orang",
+        yaxis=dict(showgrid=True, gridcolor='rgba(128,128,128,0.2)'),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        legend=dict(x=0.75, y=0.9),
+        height=380
+    )
+    figs['bmi'] = fig_bmi
+
+    # Hitung Rata-rata Risiko per Kategori Usia
+    age_risk = df.groupby('Age')['Diabetes_binary'].mean() * 100
+    # Buat List Label agar urut sesuai index 1-13
+    age_labels = [AGE_MAP.get(x, str(x)) for x in age_risk.index]
+
+    fig_age = go.Figure()
+    fig_age.add_trace(go.Scatter(
+        x=age_labels,
+        y=age_risk.values,
+        mode='lines+markers',
+        line=dict(color='#e76f51', width=4, shape='spline'),
+        marker=dict(size=10, color='white', line=dict(width=2, color='#e76f51')),
+        hovertemplate='<b>Usia: %{x}</b><br>Risiko Rata-rata: %{y:.1f}%<extra></extra>'
+    ))
+    fig_age.update_layout(
+        title="Peningkatan Risiko Berdasarkan Usia",
+        xaxis_title="Kelompok Usia",
+        yaxis_title="Persentase Penderita Diabetes (%)",
+        yaxis=dict(showgrid=True, gridcolor='rgba(128,128,128,0.2)'),
+        xaxis=dict(tickangle=-45),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        height=380
+    )
+    figs['age'] = fig_age
+    stats["max_risk_age"] = age_labels[age_risk.argmax()]
+
+    # GenHlth: 1 (Excellent) -> 5 (Poor) Mapping Label agar mudah dibaca
+    health_risk = df.groupby(df['GenHlth'].map(HEALTH_LABELS).rename('GenHlth_Label'))['Diabetes_binary'].mean().reset_index()
+    # Sort  (Sangat Baik -> Buruk)
+    sorter = ["Sangat Baik", "Baik Sekali", "Baik", "Cukup", "Buruk"]
+    health_risk['GenHlth_Label'] = pd.Categorical(health_risk['GenHlth_Label'], categories=sorter, ordered=True)
+    health_risk = health_risk.sort_values('GenHlth_Label')
+
+    fig_genhlth = go.Figure()
+    fig_genhlth.add_trace(go.Bar(
+        x=health_risk['GenHlth_Label'],
+        y=health_risk['Diabetes_binary'] * 100,
+        marker_color=['#2a9d8f', '#2a9d8f', '#e9c46a', '#f4a261', '#e76f51'],
+        text=[f"{v:.1f}%" for v in health_risk['Diabetes_binary'] * 100],
+        textposition='auto',
+    ))
+    fig_genhlth.update_layout(
+        title="Persentase Diabetes berdasarkan Persepsi Kesehatan",
+        xaxis_title="Persepsi Kesehatan Diri Sendiri",
+        yaxis_title="% Penderita Diabetes",
+        yaxis=dict(showgrid=False),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        height=350
+    )
+    figs['genhlth'] = fig_genhlth
+
+    # Dampak Kebiasaan Buruk vs Baik
+    habits = {
+        'Perokok Aktif': df[df['Smoker'] == 1]['Diabetes_binary'].mean(),
+        'Bukan Perokok': df[df['Smoker'] == 0]['Diabetes_binary'].mean(),
+        'Aktif Olahraga': df[df['PhysActivity'] == 1]['Diabetes_binary'].mean(),
+        'Jarang Olahraga': df[df['PhysActivity'] == 0]['Diabetes_binary'].mean(),
+        'Makan Sayur Tiap Hari': df[df['Veggies'] == 1]['Diabetes_binary'].mean(),
+        'Jarang Makan Sayur': df[df['Veggies'] == 0]['Diabetes_binary'].mean()
+    }
+
+    # Ubah ke Dataframe untuk plotting
+    habit_df = pd.DataFrame(list(habits.items()), columns=['Kebiasaan', 'Risiko'])
+    habit_df['Risiko'] = habit_df['Risiko'] * 100
+    habit_df['Color'] = ['#e76f51', '#2a9d8f', '#2a9d8f', '#e76f51', '#2a9d8f', '#e76f51'] # Merah utk bad habit, Hijau utk good
+
+    fig_habit = go.Figure(go.Bar(
+        x=habit_df['Risiko'],
+        y=habit_df['Kebiasaan'],
+        orientation='h',
+        marker_color=habit_df['Color'],
+        text=[f"{v:.1f}%" for v in habit_df['Risiko']],
+        textposition='inside',
+        insidetextanchor='middle'
+    ))
+
+    fig_habit.update_layout(
+        title="Perbandingan Risiko: Gaya Hidup Sehat vs Tidak",
+        xaxis_title="Persentase Penderita Diabetes (%)",
+        xaxis=dict(showgrid=True, gridcolor='rgba(128,128,128,0.2)'),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        height=350,
+        margin=dict(l=10)
+    )
+    figs['habit'] = fig_habit
+
+    # Rata-rata hari sakit fisik & mental dalam 30 hari terakhir
+    avg_health_days = df.groupby('Diabetes_binary')[['PhysHlth', 'MentHlth']].mean().reset_index()
+    fig_days = go.Figure()
+    # Bar Kesehatan Fisik
+    fig_days.add_trace(go.Bar(
+        name='Hari Sakit Fisik',
+        x=['Non-Diabetes', 'Diabetes'],
+        y=avg_health_days['PhysHlth'],
+        marker_color='#457b9d',
+        text=[f"{v:.1f} Hari" for v in avg_health_days['PhysHlth']],
+        textposition='auto'
+    ))
+
+    # Bar Kesehatan Mental
+    fig_days.add_trace(go.Bar(
+        name='Hari Terganggu Mental',
+        x=['Non-Diabetes', 'Diabetes'],
+        y=avg_health_days['MentHlth'],
+        marker_color='#a8dadc',
+        text=[f"{v:.1f} Hari" for v in avg_health_days['MentHlth']],
+        textposition='auto'
+    ))
+
+    fig_days.update_layout(
+        title="Rata-rata Jumlah Hari 'Kurang Sehat' dalam Sebulan (30 Hari)",
+        yaxis_title="Jumlah Hari",
+        barmode='group', # Grouped bar chart
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        height=300
+    )
+    figs['days'] = fig_days
+
+    # HEATMAP korelasi
+    selected_features = ['Diabetes_binary', 'HighBP', 'HighChol', 'BMI', 'Age', 'GenHlth', 'DiffWalk', 'HeartDiseaseorAttack']
+
+    rename_map = {
+        'Diabetes_binary': 'Diabetes',
+        'HighBP': 'Darah Tinggi',
+        'HighChol': 'Kolesterol',
+        'GenHlth': 'Kesehatan Umum',
+        'DiffWalk': 'Susah Jalan',
+        'HeartDiseaseorAttack': 'Sakit Jantung',
+        'Age': 'Usia'
+    }
+
+    corr_df = df[selected_features].rename(columns=rename_map).corr()
+
+    # Buat Heatmap
+    fig_corr = px.imshow(
+        corr_df,
+        text_auto='.2f',
+        aspect="auto",
+        color_continuous_scale='RdBu_r',
+        origin='lower'
+    )
+
+    fig_corr.update_layout(
+        title="Matriks Korelasi (Warna Merah = Hubungan Kuat)",
+        margin=dict(t=30, l=0, r=0, b=0),
+        height=350,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        coloraxis_showscale=False
+    )
+    figs['corr'] = fig_corr
+
+    # Logika Interpretasi
+    corr_target = corr_df['Diabetes'].drop('Diabetes')
+    top_3 = corr_target.sort_values(ascending=False).head(3)
+    stats["top_factor"] = top_3.index[0]
+    stats["top_factor_corr"] = float(top_3.values[0])
+    return figs, stats
+
+
+def serialize_figures(figs):
+    return {name: pio.to_json(fig, validate=False) for name, fig in figs.items()}
+
+
+def deserialize_figures(fig_json):
+    return {name: pio.from_json(js) for name, js in fig_json.items()}
@@ -0,0 +1,171 @@
+"""Tabel lookup risiko untuk seluruh kombinasi fitur diskrit.
+
+Semua fitur biner + Age, GenHlth, Education, Income membentuk grid berhingga (51 juta key).
+Logit & skor guardrail bersifat aditif, jadi nilai per key = sub-tabel biner (2^14 baris)
++ sub-tabel ordinal (13*5*6*8 baris, termasuk intercept); hanya dua sub-tabel itu yang
+disimpan (.npy float64/int8, ~175 KB, dibuka memory-mapped). Saat query: key -> dua lookup
++ tambah suku kontinu (BMI, MentHlth, PhysHlth) + sigmoid + guardrail floor.
+
+    python risk_table.py compile            # tulis risk_table/
+    python risk_table.py verify --n 100000  # cek parity vs predict_proba + override
+"""
+import argparse
+import itertools
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from scoring import (
+    FEATURE_NAMES, FEATURE_RANGES, GUARDRAIL_RULES,
+    load_artifacts, effective_coefficients, guardrail_points, guardrail_score, apply_guardrails, sigmoid
+)
+
+RISK_TABLE_DIR = "risk_table"
+# Naikkan jika isi/format file tabel berubah; tabel dengan format lain dianggap basi
+RISK_TABLE_FORMAT = 2
+TABLE_FILES = ["bin_logit", "bin_score", "ord_logit", "ord_score"]
+
+BINARY_FEATURES = [f for f in FEATURE_NAMES if f not in FEATURE_RANGES]
+ORDINAL_FEATURES = ["Age", "GenHlth", "Education", "Income"]
+DISCRETE_FEATURES = BINARY_FEATURES + ORDINAL_FEATURES
+CONTINUOUS_FEATURES = [f for f in FEATURE_NAMES if f not in DISCRETE_FEATURES]
+
+# Nilai terkecil & jumlah nilai per dimensi; key = ravel_multi_index(nilai - terkecil, DIMS)
+LOWS = [0] * len(BINARY_FEATURES) + [FEATURE_RANGES[f][0] for f in ORDINAL_FEATURES]
+DIMS = [2] * len(BINARY_FEATURES) + [FEATURE_RANGES[f][1] - FEATURE_RANGES[f][0] + 1 for f in ORDINAL_FEATURES]
+N_BINARY_KEYS = 2 ** len(BINARY_FEATURES)
+N_ORDINAL_KEYS = int(np.prod(DIMS[len(BINARY_FEATURES):]))
+
+
+def _grid(features, lows, dims):
+    # Semua kombinasi nilai, urutan C (dimensi terakhir paling cepat) = urutan ravel_multi_index
+    return np.array(list(itertools.product(*[range(lo, lo + d) for lo, d in zip(lows, dims)])), dtype=float)
+
+def _partials(grid, features, w, feature_names):
+    logit = grid @ np.array([w[feature_names.index(f)] for f in features])
+    score = np.zeros(len(grid), dtype=np.int8)
+    for j, f in enumerate(features):
+        if f in GUARDRAIL_RULES:
+            score += guardrail_points(f, grid[:, j])
+    return logit, score
+
+
+def compile_table(w, b, feature_names, out_dir=RISK_TABLE_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    n_bin = len(BINARY_FEATURES)
+    bin_logit, bin_score = _partials(_grid(BINARY_FEATURES, LOWS[:n_bin], DIMS[:n_bin]), BINARY_FEATURES, w, feature_names)
+    ord_logit, ord_score = _partials(_grid(ORDINAL_FEATURES, LOWS[n_bin:], DIMS[n_bin:]), ORDINAL_FEATURES, w, feature_names)
+    tables = {"bin_logit": bin_logit, "bin_score": bin_score, "ord_logit": ord_logit + b, "ord_score": ord_score}
+    for name in TABLE_FILES:
+        np.save(os.path.join(out_dir, f"{name}.npy"), tables[name])
+
+    # Metadata untuk memastikan tabel cocok dengan model & guardrail yang sedang dipakai
+    meta = {
+        "format": RISK_TABLE_FORMAT,
+        "feature_names": list(feature_names),
+        "coef": [float(v) for v in w],
+        "intercept": float(b),
+        "guardrail_rules": {f: [list(r) for r in rules] for f, rules in GUARDRAIL_RULES.items()},
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def load_table(w, b, feature_names, table_dir=RISK_TABLE_DIR):
+    # Return dict sub-tabel (memory-mapped) atau None jika tidak ada / basi / tidak cocok dengan model
+    try:
+        with open(os.path.join(table_dir, "meta.json")) as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    rules = {f: [list(r) for r in rules] for f, rules in GUARDRAIL_RULES.items()}
+    if (meta.get("format") != RISK_TABLE_FORMAT or meta.get("feature_names") != list(feature_names)
+            or meta.get("guardrail_rules") != rules
+            or not np.allclose(meta["coef"], w) or not np.isclose(meta["intercept"], b)):
+        print("risk_table tidak cocok dengan model saat ini, compile ulang dengan: python risk_table.py compile")
+        return None
+    try:
+        table = {name: np.load(os.path.join(table_dir, f"{name}.npy"), mmap_mode="r") for name in TABLE_FILES}
+    except (FileNotFoundError, ValueError):
+        print("File risk_table tidak lengkap, compile ulang dengan: python risk_table.py compile")
+        return None
+    table["continuous_w"] = {f: w[feature_names.index(f)] for f in CONTINUOUS_FEATURES}
+    return table
+
+
+def table_key(data):
+    # data: dict / DataFrame fitur mentah -> key integer (ValueError jika di luar grid).
+    # key = key_biner * N_ORDINAL_KEYS + key_ordinal
+    return np.ravel_multi_index(
+        [np.asarray(data[f]).astype(np.int64) - lo for f, lo in zip(DISCRETE_FEATURES, LOWS)], DIMS
+    )
+
+def score_with_table(table, data):
+    # Skalar (dict) atau batch (DataFrame): return (prob mentah, prob final)
+    bin_key, ord_key = np.divmod(table_key(data), N_ORDINAL_KEYS)
+    logit = table["bin_logit"][bin_key] + table["ord_logit"][ord_key]
+    score = table["bin_score"][bin_key] + table["ord_score"][ord_key]
+    for f, wf in table["continuous_w"].items():
+        logit = logit + wf * np.asarray(data[f], dtype=float)
+        if f in GUARDRAIL_RULES:
+            score = score + guardrail_points(f, data[f])
+    raw_prob = sigmoid(logit)
+    return raw_prob, apply_guardrails(raw_prob, score)
+
+
+def random_population(n, seed=0):
+    # Sampel acak seluruh ruang input (diskrit + kontinu) untuk uji parity
+    rng = np.random.default_rng(seed)
+    data = {f: rng.integers(0, 2, n) for f in BINARY_FEATURES}
+    for f in ORDINAL_FEATURES + ["MentHlth", "PhysHlth"]:
+        lo, hi = FEATURE_RANGES[f]
+        data[f] = rng.integers(lo, hi + 1, n)
+    data["BMI"] = rng.uniform(*FEATURE_RANGES["BMI"], n)
+    return pd.DataFrame(data)
+
+
+def verify(table, model, scaler, feature_names, scaled_features_list, n=100_000, seed=0):
+    # Parity vs jalur app: predict_proba (dengan scaler) lalu override guardrail
+    df = random_population(n, seed)
+    X = df[feature_names].astype(float)
+    cols_to_scale = [c for c in scaled_features_list if c in X.columns]
+    X[cols_to_scale] = scaler.transform(X[cols_to_scale])
+    raw_ref = model.predict_proba(X)[:, 1]
+    final_ref = apply_guardrails(raw_ref, guardrail_score(df))
+
+    raw_prob, final_prob = score_with_table(table, df)
+    return float(np.abs(raw_prob - raw_ref).max()), float(np.abs(final_prob - final_ref).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile / verifikasi tabel lookup risiko")
+    parser.add_argument("command", choices=["compile", "verify"])
+    parser.add_argument("--dir", default=RISK_TABLE_DIR)
+    parser.add_argument("--n", type=int, default=100_000, help="Jumlah sampel acak untuk verify")
+    parser.add_argument("--tol", type=float, default=1e-12)
+    args = parser.parse_args()
+
+    model, scaler, feature_names, scaled_features_list = load_artifacts()
+    if model is None:
+        raise SystemExit("Model tidak ditemukan.")
+    w, b = effective_coefficients(model, scaler, feature_names, scaled_features_list)
+
+    if args.command == "compile":
+        compile_table(w, b, feature_names, args.dir)
+        print(f"{N_BINARY_KEYS * N_ORDINAL_KEYS:,} kombinasi disimpan ke {args.dir}/")
+        return
+
+    table = load_table(w, b, feature_names, args.dir)
+    if table is None:
+        raise SystemExit("Tabel tidak ditemukan atau tidak cocok.")
+    raw_diff, final_diff = verify(table, model, scaler, feature_names, scaled_features_list, n=args.n)
+    print(f"Selisih maks prob mentah: {raw_diff:.2e}, prob final: {final_diff:.2e}")
+    if max(raw_diff, final_diff) > args.tol:
+        raise SystemExit(f"Parity GAGAL (toleransi {args.tol:g})")
+    print("Parity OK")
+
+
+if __name__ == "__main__":
+    main()
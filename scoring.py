@@ -0,0 +1,239 @@
+import bisect
+import json
+import numpy as np
+import joblib
+
+# Urutan fitur default (sama dengan feature_names.pkl)
+FEATURE_NAMES = [
+    "HighBP", "HighChol", "CholCheck", "BMI", "Smoker", "Stroke", "HeartDiseaseorAttack",
+    "PhysActivity", "Fruits", "Veggies", "HvyAlcoholConsump", "AnyHealthcare", "NoDocbcCost",
+    "GenHlth", "MentHlth", "PhysHlth", "DiffWalk", "Sex", "Age", "Education", "Income"
+]
+SCALED_FEATURES = ["BMI", "MentHlth", "PhysHlth", "Age", "Education", "Income", "GenHlth"]
+
+# Rentang nilai valid per fitur non-biner (kode BRFSS)
+FEATURE_RANGES = {
+    "BMI": (12.0, 98.0), "GenHlth": (1, 5), "MentHlth": (0, 30), "PhysHlth": (0, 30),
+    "Age": (1, 13), "Education": (1, 6), "Income": (1, 8)
+}
+
+DATASET_PATH = "diabetes_binary_5050split_health_indicators_BRFSS2015.csv"
+# Threshold hasil tuning (tune_thresholds.py); default di bawah dipakai jika file tidak ada
+THRESHOLDS_PATH = "thresholds.json"
+# Ensemble koefisien bootstrap (bootstrap_coefficients.py)
+BOOTSTRAP_PATH = "bootstrap_coefs.npz"
+
+# Batas kategori risiko: prob < 0.30 -> Sangat Rendah, dst.
+DEFAULT_RISK_BANDS = [0.30, 0.50, 0.70, 0.85]
+RISK_LEVELS = [
+    ("Sangat Rendah", "green", "😊"),
+    ("Rendah", "lightgreen", "🙂"),
+    ("Sedang", "orange", "😐"),
+    ("Tinggi", "darkorange", "😕"),
+    ("Sangat Tinggi", "red", "😞"),
+]
+
+# Clinical guardrails: (ambang, poin). Untuk BMI yang berlaku hanya ambang tertinggi yang terpenuhi.
+GUARDRAIL_RULES = {
+    # Faktor Kritis (Bobot Besar)
+    "HighBP": [(1, 2)],
+    "HighChol": [(1, 2)],
+    "BMI": [(30, 3), (25, 1)],
+    "HeartDiseaseorAttack": [(1, 3)],
+    "Stroke": [(1, 3)],
+    # Faktor Tambahan
+    "GenHlth": [(4, 2)],
+    "DiffWalk": [(1, 1)],
+    "Age": [(9, 1)],
+}
+# Mulai band ini (Sedang) halaman hasil menampilkan saran "perhatian medis"
+ATTENTION_BAND = 2
+
+# (skor minimum, probabilitas minimum), dari yang paling berbahaya
+DEFAULT_GUARDRAIL_FLOORS = [(6, 0.86), (4, 0.72), (2, 0.55)]
+
+
+def load_thresholds(path=THRESHOLDS_PATH):
+    try:
+        with open(path) as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        config = {}
+    risk_bands = [float(t) for t in config.get("risk_bands", DEFAULT_RISK_BANDS)]
+    guardrail_floors = [(int(s), float(p)) for s, p in config.get("guardrail_floors", DEFAULT_GUARDRAIL_FLOORS)]
+    # Floor di-tune untuk band di file yang sama, jadi band tidak valid -> keduanya kembali ke default
+    if not valid_risk_bands(risk_bands):
+        print(f"risk_bands tidak valid di {path}: {risk_bands}, memakai band & floor default")
+        return list(DEFAULT_RISK_BANDS), list(DEFAULT_GUARDRAIL_FLOORS)
+    # Floor: skor turun (tier paling berbahaya dulu), probabilitas di [0, 1]
+    if (not guardrail_floors or any(not 0 <= p <= 1 for _, p in guardrail_floors)
+            or any(a[0] <= b[0] for a, b in zip(guardrail_floors, guardrail_floors[1:]))):
+        print(f"guardrail_floors tidak valid di {path}: {guardrail_floors}, memakai default")
+        guardrail_floors = list(DEFAULT_GUARDRAIL_FLOORS)
+    return risk_bands, guardrail_floors
+
+def valid_risk_bands(risk_bands):
+    # Tepat len(RISK_LEVELS) - 1 batas yang naik di (0, 1), kalau tidak get_risk_category bisa IndexError
+    return (len(risk_bands) == len(RISK_LEVELS) - 1 and 0 < risk_bands[0] and risk_bands[-1] < 1
+            and all(lo < hi for lo, hi in zip(risk_bands, risk_bands[1:])))
+
+RISK_BANDS, GUARDRAIL_FLOORS = load_thresholds()
+# Batas saran "perhatian medis" = batas bawah band Sedang hasil tuning
+ATTENTION_THRESHOLD = RISK_BANDS[ATTENTION_BAND - 1]
+
+
+def load_artifacts(base_dir="."):
+    try:
+        model = joblib.load(f"{base_dir}/logreg_model.pkl")
+        scaler = joblib.load(f"{base_dir}/scaler.pkl")
+        feature_names = joblib.load(f"{base_dir}/feature_names.pkl")
+
+        # Coba load list fitur scaled, jika tidak ada, gunakan default list
+        try:
+            scaled_features_list = joblib.load(f"{base_dir}/scaled_features_list.pkl")
+        except:
+            scaled_features_list = list(SCALED_FEATURES)
+
+        return model, scaler, feature_names, scaled_features_list
+    except FileNotFoundError:
+        return None, None, None, None
+
+
+#fungsi pembantu
+def map_age_to_ageg5yr(age):
+    if age < 25: return 1
+    elif age < 30: return 2
+    elif age < 35: return 3
+    elif age < 40: return 4
+    elif age < 45: return 5
+    elif age < 50: return 6
+    elif age < 55: return 7
+    elif age < 60: return 8
+    elif age < 65: return 9
+    elif age < 70: return 10
+    elif age < 75: return 11
+    elif age < 80: return 12
+    else: return 13
+
+def map_education(label):
+    mapping = {"SD": 2, "SMP": 3, "SMA": 4, "D3/S1": 5, "S2/S3": 6, "Tidak Sekolah/SD": 2, "Sarjana+": 6}
+    return mapping.get(label, 4)
+
+def map_income_rp(rp):
+    if rp < 15000000: return 1
+    elif rp < 25000000: return 2
+    elif rp < 35000000: return 3
+    elif rp < 50000000: return 4
+    elif rp < 75000000: return 5
+    elif rp < 100000000: return 6
+    elif rp < 150000000: return 7
+    else: return 8
+
+def get_risk_category(prob):
+    # Threshold disesuaikan agar lebih sensitif
+    return RISK_LEVELS[bisect.bisect_right(RISK_BANDS, prob)]
+
+def risk_band_index(probs, bands=None):
+    # Versi vektor dari get_risk_category -> indeks 0..4 pada RISK_LEVELS
+    return np.searchsorted(RISK_BANDS if bands is None else bands, probs, side="right")
+
+
+def encode_form_data(fd):
+    # form_data wizard -> fitur model (belum di-scale)
+    return {
+        "HighBP": int(fd['HighBP']), "HighChol": int(fd['HighChol']), "CholCheck": int(fd['CholCheck']),
+        "BMI": fd['bmi'], "Smoker": int(fd['Smoker']), "Stroke": int(fd['Stroke']),
+        "HeartDiseaseorAttack": int(fd['HeartDiseaseorAttack']), "PhysActivity": int(fd['PhysActivity']),
+        "Fruits": int(fd['Fruits']), "Veggies": int(fd['Veggies']), "HvyAlcoholConsump": int(fd['HvyAlcoholConsump']),
+        "AnyHealthcare": int(fd['AnyHealthcare']), "NoDocbcCost": int(fd['NoDocbcCost']),
+        "GenHlth": fd['GenHlth'], "MentHlth": fd['MentHlth'], "PhysHlth": fd['PhysHlth'],
+        "DiffWalk": int(fd['DiffWalk']), "Sex": 1 if fd['sex'] == "Laki-laki" else 0,
+        "Age": map_age_to_ageg5yr(fd['age']),
+        "Education": map_education(fd['education']),
+        "Income": map_income_rp(fd['income'])
+    }
+
+
+def guardrail_points(feature, values):
+    # Kontribusi satu fitur ke risk_score; bekerja untuk skalar maupun array (broadcast)
+    values = np.asarray(values)
+    points = np.zeros(values.shape, dtype=np.int8)
+    for threshold, pts in reversed(GUARDRAIL_RULES[feature]):
+        points = np.where(values >= threshold, pts, points).astype(np.int8)
+    return points
+
+def guardrail_score(data):
+    # data: dict / DataFrame berisi kolom fitur mentah (belum di-scale)
+    return sum(guardrail_points(f, data[f]) for f in GUARDRAIL_RULES)
+
+def apply_guardrails(raw_prob, risk_score, floors=None):
+    # Logika Override Probabilitas: naikkan prob ke batas bawah sesuai tingkat bahaya
+    risk_score = np.asarray(risk_score)
+    floor = np.zeros(risk_score.shape)
+    for min_score, min_prob in reversed(GUARDRAIL_FLOORS if floors is None else floors):
+        floor = np.where(risk_score >= min_score, min_prob, floor)
+    return np.maximum(raw_prob, floor)
+
+def is_overridden(risk_score):
+    # True jika masuk tingkat guardrail paling berbahaya (komplikasi multi-faktor)
+    return risk_score >= GUARDRAIL_FLOORS[0][0]
+
+
+def fold_scaler(coef, intercept, scaler, feature_names, scaled_features_list):
+    # Lipat StandardScaler ke dalam koefisien -> logit = X_mentah @ coef.T + intercept
+    # coef: (21,) atau (B, 21), intercept: skalar atau (B,)
+    coef = np.array(coef, dtype=float)
+    intercept = np.array(intercept, dtype=float)
+    if scaler is not None and scaled_features_list:
+        for j, col in enumerate(scaled_features_list):
+            if col not in feature_names:
+                continue
+            i = feature_names.index(col)
+            coef[..., i] = coef[..., i] / scaler.scale_[j]
+            intercept = intercept - coef[..., i] * scaler.mean_[j]
+    return coef, intercept
+
+def effective_coefficients(model, scaler, feature_names, scaled_features_list):
+    w, b = fold_scaler(model.coef_[0], model.intercept_[0], scaler, feature_names, scaled_features_list)
+    return w, float(b)
+
+def sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+def score_frame(df, w, b, feature_names=FEATURE_NAMES):
+    # Skor batch: return (prob mentah model, prob final setelah guardrails)
+    X = df[feature_names].to_numpy(dtype=float)
+    raw_prob = sigmoid(X @ w + b)
+    return raw_prob, apply_guardrails(raw_prob, guardrail_score(df))
+
+
+def load_bootstrap(path=BOOTSTRAP_PATH, scaler=None, feature_names=FEATURE_NAMES, scaled_features_list=SCALED_FEATURES):
+    # Koefisien bootstrap (B x 21) dari bootstrap_coefficients.py, dilipat ke ruang fitur mentah.
+    # Koefisien berada di ruang ter-scale, jadi hanya dipakai jika fitur & scaler sama dengan saat dibuat.
+    try:
+        data = np.load(path)
+    except FileNotFoundError:
+        return None, None
+    keys = ("feature_names", "scaled_features_list", "scaler_mean", "scaler_scale")
+    if (any(k not in data for k in keys)
+            or list(data["feature_names"]) != list(feature_names)
+            or list(data["scaled_features_list"]) != list(scaled_features_list or [])
+            or scaler is None or not np.allclose(data["scaler_mean"], scaler.mean_)
+            or not np.allclose(data["scaler_scale"], scaler.scale_)):
+        print(f"{path} tidak cocok dengan model/scaler saat ini, buat ulang dengan: python bootstrap_coefficients.py")
+        return None, None
+    return fold_scaler(data["coef"], data["intercept"], scaler, feature_names, scaled_features_list)
+
+def prediction_interval(X, W, b, risk_score, level=0.95):
+    """Interval persentil prob final dari ensemble bootstrap.
+
+    X: (21,) satu orang -> satu perkalian matriks-vektor W @ x
+       (N, 21) batch    -> satu perkalian matriks-matriks X @ W.T
+    Return (lower, upper) dengan bentuk () atau (N,).
+    """
+    X = np.asarray(X, dtype=float)
+    probs = sigmoid(X @ W.T + b)
+    final_prob = apply_guardrails(probs, np.asarray(risk_score)[..., None])
+    tail = (1 - level) / 2 * 100
+    lower, upper = np.percentile(final_prob, [tail, 100 - tail], axis=-1)
+    return lower, upper
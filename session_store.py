@@ -0,0 +1,119 @@
+"""State wizard yang ringkas & tahan restart.
+
+form_data (23 key) + current_step + show_prediction dipadatkan menjadi record biner
+berukuran tetap (RECORD_SIZE byte): semua flag masuk satu bitfield, nilai ordinal jadi
+int kecil. Record disimpan di SQLite lokal dengan TTL sehingga user bisa melanjutkan
+wizard setelah reconnect websocket atau restart worker.
+
+Key record = hash(cookie rahasia per browser + id tab di URL): link yang disalin ke browser
+lain tidak membuka data orang lain, dan dua tab di browser yang sama punya record sendiri.
+"""
+import hashlib
+import sqlite3
+import struct
+import time
+
+SESSION_DB_PATH = "sessions.db"
+SESSION_TTL_SECONDS = 24 * 60 * 60
+SESSION_COOKIE = "diabetes_browser_id"
+
+DEFAULT_FORM_DATA = {
+    'age': 30, 'sex': 'Perempuan', 'weight': 60.0, 'height': 165.0, 'bmi': 22.0,
+    'HighBP': False, 'HighChol': False, 'CholCheck': False, 'Smoker': False,
+    'Stroke': False, 'HeartDiseaseorAttack': False, 'PhysActivity': False,
+    'DiffWalk': False, 'Fruits': False, 'Veggies': False, 'HvyAlcoholConsump': False,
+    'MentHlth': 0, 'PhysHlth': 0, 'GenHlth': 2, 'education': 'SMA',
+    'income': 30000000, 'AnyHealthcare': True, 'NoDocbcCost': False
+}
+EDUCATION_OPTIONS = ["SD", "SMP", "SMA", "D3/S1", "S2/S3"]
+
+# Urutan bit pada bitfield (bit 0 = HighBP, ...)
+FLAG_FIELDS = [
+    'HighBP', 'HighChol', 'CholCheck', 'Smoker', 'Stroke', 'HeartDiseaseorAttack', 'PhysActivity',
+    'DiffWalk', 'Fruits', 'Veggies', 'HvyAlcoholConsump', 'AnyHealthcare', 'NoDocbcCost'
+]
+SEX_BIT = len(FLAG_FIELDS)          # 1 = Laki-laki
+SHOW_PREDICTION_BIT = SEX_BIT + 1
+
+# versi, flags, age, MentHlth, PhysHlth, GenHlth, education, current_step, weight, height, bmi, income
+# (bmi float64 agar input model identik sebelum/sesudah pack)
+RECORD_FORMAT = "<BHBBBBBBffdI"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+RECORD_VERSION = 1
+
+
+def pack_record(form_data, current_step=1, show_prediction=False):
+    flags = 0
+    for bit, field in enumerate(FLAG_FIELDS):
+        if form_data[field]:
+            flags |= 1 << bit
+    if form_data['sex'] == "Laki-laki":
+        flags |= 1 << SEX_BIT
+    if show_prediction:
+        flags |= 1 << SHOW_PREDICTION_BIT
+
+    education = form_data['education']
+    education_idx = EDUCATION_OPTIONS.index(education) if education in EDUCATION_OPTIONS else 2
+    return struct.pack(
+        RECORD_FORMAT, RECORD_VERSION, flags,
+        int(form_data['age']), int(form_data['MentHlth']), int(form_data['PhysHlth']),
+        int(form_data['GenHlth']), education_idx, int(current_step),
+        form_data['weight'], form_data['height'], form_data['bmi'], int(form_data['income'])
+    )
+
+
+def unpack_record(record):
+    # Return (form_data, current_step, show_prediction)
+    (_, flags, age, ment_hlth, phys_hlth, gen_hlth, education_idx, current_step,
+     weight, height, bmi, income) = struct.unpack(RECORD_FORMAT, record)
+    form_data = {field: bool(flags >> bit & 1) for bit, field in enumerate(FLAG_FIELDS)}
+    form_data.update({
+        'age': age, 'sex': "Laki-laki" if flags >> SEX_BIT & 1 else "Perempuan",
+        # float32 -> dibulatkan agar number_input menampilkan nilai yang sama dengan input user
+        'weight': round(weight, 2), 'height': round(height, 2), 'bmi': bmi,
+        'MentHlth': ment_hlth, 'PhysHlth': phys_hlth, 'GenHlth': gen_hlth,
+        'education': EDUCATION_OPTIONS[education_idx], 'income': income,
+    })
+    return form_data, current_step, bool(flags >> SHOW_PREDICTION_BIT & 1)
+
+
+def session_key(browser_id, tab_id):
+    # Yang disimpan di DB hanya hash-nya, bukan nilai cookie
+    return hashlib.sha256(f"{browser_id}:{tab_id}".encode()).hexdigest()
+
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=5)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS wizard_sessions ("
+        "sid TEXT PRIMARY KEY, record BLOB NOT NULL, updated_at REAL NOT NULL)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_wizard_updated ON wizard_sessions(updated_at)")
+    return conn
+
+
+def save_record(sid, record, db_path=SESSION_DB_PATH, ttl=SESSION_TTL_SECONDS):
+    # Simpan record + buang sesi yang sudah kedaluwarsa (murah karena ada index updated_at)
+    now = time.time()
+    with _connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO wizard_sessions (sid, record, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(sid) DO UPDATE SET record = excluded.record, updated_at = excluded.updated_at",
+            (sid, record, now)
+        )
+        conn.execute("DELETE FROM wizard_sessions WHERE updated_at < ?", (now - ttl,))
+    conn.close()
+
+
+def load_record(sid, db_path=SESSION_DB_PATH, ttl=SESSION_TTL_SECONDS):
+    # Return record bytes atau None jika tidak ada / kedaluwarsa / versi lama
+    with _connect(db_path) as conn:
+        row = conn.execute(
+            "SELECT record FROM wizard_sessions WHERE sid = ? AND updated_at >= ?",
+            (sid, time.time() - ttl)
+        ).fetchone()
+    conn.close()
+    if row is None or len(row[0]) != RECORD_SIZE or row[0][0] != RECORD_VERSION:
+        return None
+    return bytes(row[0])
@@ -0,0 +1,132 @@
+"""Shadow scoring & A/B untuk model kandidat.
+
+Konfigurasi di shadow_config.json, contoh:
+
+    {
+      "candidates": {"v2": "candidates/v2"},
+      "ab_split": {"v2": 0.10}
+    }
+
+Tiap folder kandidat berisi file yang sama dengan model produksi (logreg_model.pkl, scaler.pkl, ...).
+Ringkasan log: python shadow.py
+"""
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from scoring import load_artifacts, effective_coefficients, apply_guardrails, risk_band_index, sigmoid
+
+SHADOW_CONFIG_PATH = "shadow_config.json"
+SHADOW_LOG_PATH = "shadow_log.jsonl"
+PRODUCTION = "production"
+
+# Satu thread latar belakang: skor kandidat & tulis log di luar jalur render hasil
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+_log_lock = threading.Lock()
+
+
+def load_candidates(feature_names, config_path=SHADOW_CONFIG_PATH):
+    # Return ({nama: (w, b)}, ab_split); kandidat dilipat ke ruang fitur mentah produksi
+    try:
+        with open(config_path) as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return {}, {}
+
+    candidates = {}
+    for name, base_dir in config.get("candidates", {}).items():
+        model, scaler, cand_features, scaled_features_list = load_artifacts(base_dir)
+        if model is None:
+            print(f"Kandidat {name} tidak ditemukan di {base_dir}")
+            continue
+        missing = [f for f in feature_names if f not in cand_features]
+        if missing:
+            print(f"Kandidat {name} dilewati, fitur tidak ada: {', '.join(missing)}")
+            continue
+        w, b = effective_coefficients(model, scaler, cand_features, scaled_features_list)
+        # Samakan urutan fitur dengan vektor produksi agar vektor input bisa dipakai bersama
+        order = [cand_features.index(f) for f in feature_names]
+        candidates[name] = (w[order], b)
+
+    # Porsi trafik tiap kandidat di [0, 1] dan totalnya <= 1 (sisanya produksi)
+    try:
+        ab_split = {name: float(p) for name, p in config.get("ab_split", {}).items()}
+    except (TypeError, ValueError):
+        ab_split = None
+    if ab_split is None or any(not 0 <= p <= 1 for p in ab_split.values()) or sum(ab_split.values()) > 1:
+        print(f"ab_split tidak valid di {config_path}: {config.get('ab_split')}, semua trafik ke produksi")
+        ab_split = {}
+    ab_split = {name: p for name, p in ab_split.items() if name in candidates}
+    return candidates, ab_split
+
+
+def assign_arm(key, ab_split):
+    # Pembagian trafik deterministik: hash(key) -> [0, 1), kunci sama selalu masuk arm yang sama
+    bucket = int(hashlib.sha256(str(key).encode()).hexdigest()[:8], 16) / 16**8
+    upper = 0.0
+    for name, share in ab_split.items():
+        upper += share
+        if bucket < upper:
+            return name
+    return PRODUCTION
+
+
+def score_vector(x, w, b, risk_score):
+    # Skor satu vektor fitur mentah -> (prob mentah, prob final)
+    raw_prob = float(sigmoid(x @ w + b))
+    return raw_prob, float(apply_guardrails(raw_prob, risk_score))
+
+
+def _shadow_records(request_id, arm, x, risk_score, served_prob, models):
+    served_band = int(risk_band_index(served_prob))
+    records = []
+    for name, (w, b) in models.items():
+        if name == arm:
+            continue
+        raw_prob, final_prob = score_vector(x, w, b, risk_score)
+        band = int(risk_band_index(final_prob))
+        records.append({
+            "ts": time.time(), "request_id": request_id, "arm": arm, "model": name,
+            "served_prob": served_prob, "shadow_raw_prob": raw_prob, "shadow_prob": final_prob,
+            "delta": final_prob - served_prob,
+            "served_band": served_band, "shadow_band": band, "band_disagree": band != served_band,
+        })
+    return records
+
+
+def _write_shadow(request_id, arm, x, risk_score, served_prob, models, log_path):
+    records = _shadow_records(request_id, arm, x, risk_score, served_prob, models)
+    with _log_lock, open(log_path, "a") as f:
+        for rec in records:
+            f.write(json.dumps(rec) + "\n")
+
+
+def submit_shadow(request_id, arm, x, risk_score, served_prob, models, log_path=SHADOW_LOG_PATH):
+    """Jadwalkan skor semua model selain arm yang melayani; langsung kembali tanpa menunggu.
+
+    models berisi produksi + kandidat ({nama: (w, b)}), x adalah vektor fitur yang
+    sudah di-encode untuk request ini sehingga map_* tidak dijalankan ulang.
+    """
+    if len(models) <= 1:
+        return None
+    return _executor.submit(_write_shadow, request_id, arm, np.asarray(x, dtype=float), risk_score,
+                            float(served_prob), models, log_path)
+
+
+def summarize_shadow_log(log_path=SHADOW_LOG_PATH):
+    df = pd.read_json(log_path, lines=True)
+    return df.groupby(["arm", "model"]).agg(
+        n=("delta", "size"),
+        mean_delta=("delta", "mean"),
+        mean_abs_delta=("delta", lambda d: d.abs().mean()),
+        band_disagree_rate=("band_disagree", "mean"),
+    ).reset_index()
+
+
+if __name__ == "__main__":
+    print(summarize_shadow_log().to_string(index=False))
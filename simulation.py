@@ -0,0 +1,231 @@
+"""Simulasi Monte Carlo risiko populasi untuk perencanaan intervensi.
+
+Contoh (20% perokok berhenti, BMI rata-rata turun 2):
+
+    python simulation.py --quit Smoker=0.2 --shift BMI=-2:1 --replicates 1000 --workers 8
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from scoring import (
+    DATASET_PATH, FEATURE_NAMES, FEATURE_RANGES, GUARDRAIL_RULES, RISK_LEVELS,
+    load_artifacts, effective_coefficients, guardrail_points, apply_guardrails,
+    risk_band_index, sigmoid
+)
+
+N_BANDS = len(RISK_LEVELS)
+HIGH_RISK_BANDS = [3, 4]  # Tinggi + Sangat Tinggi
+
+# Jumlah sel (replikasi x baris) per blok, menjaga memori per kolom ~64MB
+CHUNK_CELLS = 8_000_000
+
+
+def make_interventions(quit=None, adopt=None, shift=None):
+    """Susun spesifikasi intervensi.
+
+    quit:  {kolom biner: p}  -> tiap orang dengan kolom=1 berubah ke 0 dengan peluang p
+    adopt: {kolom biner: p}  -> tiap orang dengan kolom=0 berubah ke 1 dengan peluang p
+    shift: {kolom: (mean, sd)} -> kolom ditambah N(mean, sd), di-clip ke FEATURE_RANGES
+    """
+    interventions = {}
+    for col, p in (quit or {}).items():
+        interventions[col] = ("quit", float(p))
+    for col, p in (adopt or {}).items():
+        interventions[col] = ("adopt", float(p))
+    for col, (mean, sd) in (shift or {}).items():
+        interventions[col] = ("shift", (float(mean), float(sd)))
+    for col, (kind, _) in interventions.items():
+        if col not in FEATURE_NAMES:
+            raise ValueError(f"Kolom tidak dikenal: {col}")
+        if kind in ("quit", "adopt") and col in FEATURE_RANGES:
+            raise ValueError(f"Intervensi {kind} hanya untuk kolom biner (0/1), bukan {col}")
+    return interventions
+
+
+def validate_cohort(df, feature_names=FEATURE_NAMES):
+    """Cek kohort sebelum simulasi; return (df bersih, jumlah baris dibuang).
+
+    Kolom fitur yang hilang -> ValueError. Baris dengan nilai kosong / non-numerik (NaN akan
+    terhitung sebagai Sangat Tinggi oleh risk_band_index) atau di luar kode BRFSS (biner bukan
+    0/1, ordinal bukan bilangan bulat di FEATURE_RANGES) dibuang.
+    """
+    missing = [c for c in feature_names if c not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom fitur tidak ditemukan: {', '.join(missing)}")
+    X = df[feature_names].apply(pd.to_numeric, errors="coerce")
+    valid = X.notna().all(axis=1)
+    for col in feature_names:
+        if col not in FEATURE_RANGES:
+            valid &= X[col].isin([0, 1])
+            continue
+        lo, hi = FEATURE_RANGES[col]
+        valid &= X[col].between(lo, hi)
+        if col != "BMI":
+            valid &= X[col] == np.rint(X[col])
+    return X[valid].reset_index(drop=True), int((~valid).sum())
+
+
+def prepare_population(df, interventions, w, b, feature_names=FEATURE_NAMES):
+    # Bagian yang tidak disentuh intervensi dihitung sekali untuk semua replikasi
+    touched = [c for c in feature_names if c in interventions]
+    static = [i for i, c in enumerate(feature_names) if c not in interventions]
+    X = df[feature_names].to_numpy(dtype=float)
+
+    static_logit = X[:, static] @ w[static] + b
+    static_score = np.zeros(len(df), dtype=np.int8)
+    for f in GUARDRAIL_RULES:
+        if f not in interventions:
+            static_score += guardrail_points(f, df[f].to_numpy())
+
+    return {
+        "static_logit": static_logit,
+        "static_score": static_score,
+        "columns": {c: df[c].to_numpy(dtype=float) for c in touched},
+        "weights": {c: w[feature_names.index(c)] for c in touched},
+        "interventions": interventions,
+    }
+
+
+def _apply_intervention(values, kind, param, rng, n_reps):
+    # values: (N,) -> hasil (n_reps, N)
+    shape = (n_reps, values.shape[0])
+    if kind == "quit":
+        flip = rng.random(shape) < param
+        return np.where((values == 1) & flip, 0.0, values)
+    if kind == "adopt":
+        flip = rng.random(shape) < param
+        return np.where((values == 0) & flip, 1.0, values)
+    mean, sd = param
+    return values + rng.normal(mean, sd, shape)
+
+
+def _clip_feature(col, values):
+    if col not in FEATURE_RANGES:
+        return values
+    lo, hi = FEATURE_RANGES[col]
+    values = np.clip(values, lo, hi)
+    # Kolom ordinal / hitungan hari tetap bilangan bulat
+    return values if col == "BMI" else np.rint(values)
+
+
+def band_counts(final_prob):
+    # final_prob: (n_reps, N) -> jumlah orang per kategori risiko (n_reps, N_BANDS)
+    bands = risk_band_index(final_prob)
+    n_reps = bands.shape[0]
+    offsets = (np.arange(n_reps) * N_BANDS)[:, None]
+    return np.bincount((bands + offsets).ravel(), minlength=n_reps * N_BANDS).reshape(n_reps, N_BANDS)
+
+
+def simulate_chunk(pop, n_reps, seed):
+    rng = np.random.default_rng(seed)
+    logit = np.broadcast_to(pop["static_logit"], (n_reps, pop["static_logit"].shape[0])).copy()
+    score = np.broadcast_to(pop["static_score"], logit.shape).astype(np.int8)
+
+    for col, values in pop["columns"].items():
+        kind, param = pop["interventions"][col]
+        new_values = _clip_feature(col, _apply_intervention(values, kind, param, rng, n_reps))
+        logit += pop["weights"][col] * new_values
+        if col in GUARDRAIL_RULES:
+            score += guardrail_points(col, new_values)
+
+    final_prob = apply_guardrails(sigmoid(logit), score)
+    return band_counts(final_prob)
+
+
+# State per worker, diisi sekali lewat initializer agar array populasi tidak dikirim per tugas
+_worker_pop = None
+
+def _init_worker(pop):
+    global _worker_pop
+    _worker_pop = pop
+
+def _run_worker_chunk(args):
+    n_reps, seed = args
+    return simulate_chunk(_worker_pop, n_reps, seed)
+
+
+def run_simulation(df, interventions, model, scaler, feature_names, scaled_features_list,
+                   n_replicates=100, seed=42, workers=1):
+    """Jalankan n_replicates simulasi; return (baseline_counts (N_BANDS,), counts (n_replicates, N_BANDS))."""
+    w, b = effective_coefficients(model, scaler, feature_names, scaled_features_list)
+    baseline_pop = prepare_population(df, {}, w, b, feature_names)
+    baseline = simulate_chunk(baseline_pop, 1, seed)[0]
+
+    pop = prepare_population(df, interventions, w, b, feature_names)
+    reps_per_chunk = max(1, min(n_replicates, CHUNK_CELLS // max(len(df), 1)))
+    sizes = [reps_per_chunk] * (n_replicates // reps_per_chunk)
+    if n_replicates % reps_per_chunk:
+        sizes.append(n_replicates % reps_per_chunk)
+    # Seed independen per blok -> hasil identik berapapun jumlah worker
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = list(zip(sizes, seeds))
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(pop,)) as ex:
+            results = list(ex.map(_run_worker_chunk, tasks))
+    else:
+        results = [simulate_chunk(pop, n, s) for n, s in tasks]
+    return baseline, np.vstack(results)
+
+
+def summarize(baseline, counts):
+    # Ringkasan distribusi per kategori: baseline, rata-rata, interval 95%, selisih
+    labels = [lvl[0] for lvl in RISK_LEVELS] + ["Risiko Tinggi (Tinggi + Sangat Tinggi)"]
+    baseline = np.append(baseline, baseline[HIGH_RISK_BANDS].sum())
+    counts = np.column_stack([counts, counts[:, HIGH_RISK_BANDS].sum(axis=1)])
+    return pd.DataFrame({
+        "Kategori": labels,
+        "Baseline": baseline,
+        "Rata-rata": counts.mean(axis=0),
+        "P2.5": np.percentile(counts, 2.5, axis=0),
+        "P97.5": np.percentile(counts, 97.5, axis=0),
+        "Selisih": counts.mean(axis=0) - baseline,
+    })
+
+
+def _parse_pairs(items, with_sd=False):
+    # "Smoker=0.2" -> {"Smoker": 0.2}; "BMI=-2:1" -> {"BMI": (-2.0, 1.0)}
+    result = {}
+    for item in items or []:
+        col, value = item.split("=", 1)
+        if with_sd:
+            mean, _, sd = value.partition(":")
+            result[col] = (float(mean), float(sd or 0))
+        else:
+            result[col] = float(value)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulasi Monte Carlo intervensi populasi")
+    parser.add_argument("--data", default=DATASET_PATH, help="CSV BRFSS atau kohort dengan kolom fitur yang sama")
+    parser.add_argument("--quit", nargs="*", help="KOLOM=p, contoh Smoker=0.2")
+    parser.add_argument("--adopt", nargs="*", help="KOLOM=p, contoh PhysActivity=0.1")
+    parser.add_argument("--shift", nargs="*", help="KOLOM=mean:sd, contoh BMI=-2:1")
+    parser.add_argument("--replicates", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    model, scaler, feature_names, scaled_features_list = load_artifacts()
+    if model is None:
+        raise SystemExit("Model tidak ditemukan.")
+    df, n_dropped = validate_cohort(pd.read_csv(args.data), feature_names)
+    if n_dropped:
+        print(f"{n_dropped:,} baris dengan nilai kosong/non-numerik/di luar rentang dibuang")
+    interventions = make_interventions(
+        quit=_parse_pairs(args.quit), adopt=_parse_pairs(args.adopt), shift=_parse_pairs(args.shift, with_sd=True)
+    )
+    baseline, counts = run_simulation(
+        df, interventions, model, scaler, feature_names, scaled_features_list,
+        n_replicates=args.replicates, seed=args.seed, workers=args.workers
+    )
+    print(summarize(baseline, counts).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import pytest
+
+from scoring import load_artifacts, effective_coefficients, guardrail_score, apply_guardrails
+from risk_table import compile_table, load_table, score_with_table, random_population
+
+
+@pytest.fixture(scope="module")
+def artifacts():
+    model, scaler, feature_names, scaled_features_list = load_artifacts()
+    if model is None:
+        pytest.skip("artefak model tidak ditemukan")
+    return model, scaler, feature_names, scaled_features_list
+
+
+@pytest.fixture(scope="module")
+def table(artifacts, tmp_path_factory):
+    model, scaler, feature_names, scaled_features_list = artifacts
+    w, b = effective_coefficients(model, scaler, feature_names, scaled_features_list)
+    out_dir = tmp_path_factory.mktemp("risk_table")
+    compile_table(w, b, feature_names, out_dir)
+    return load_table(w, b, feature_names, out_dir)
+
+
+def _reference(artifacts, df):
+    # Jalur app: predict_proba dengan scaler, lalu override guardrail
+    model, scaler, feature_names, scaled_features_list = artifacts
+    X = df[feature_names].astype(float)
+    cols_to_scale = [c for c in scaled_features_list if c in X.columns]
+    X[cols_to_scale] = scaler.transform(X[cols_to_scale])
+    raw_prob = model.predict_proba(X)[:, 1]
+    return raw_prob, apply_guardrails(raw_prob, guardrail_score(df))
+
+
+def test_batch_matches_predict_proba(artifacts, table):
+    df = random_population(20_000, seed=1)
+    raw_ref, final_ref = _reference(artifacts, df)
+    raw_prob, final_prob = score_with_table(table, df)
+    np.testing.assert_allclose(raw_prob, raw_ref, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(final_prob, final_ref, rtol=0, atol=1e-12)
+    # Sampel harus mencakup baris yang kena override maupun yang tidak
+    assert (final_ref > raw_ref).any() and (final_ref == raw_ref).any()
+
+
+def test_single_row_matches_predict_proba(artifacts, table):
+    df = random_population(50, seed=2)
+    raw_ref, final_ref = _reference(artifacts, df)
+    for i, row in df.iterrows():
+        raw_prob, final_prob = score_with_table(table, row.to_dict())
+        assert raw_prob == pytest.approx(raw_ref[i], abs=1e-12)
+        assert final_prob == pytest.approx(final_ref[i], abs=1e-12)
+
+
+def test_out_of_grid_value_rejected(table):
+    row = random_population(1).iloc[0].to_dict()
+    row["Age"] = 14
+    with pytest.raises(ValueError):
+        score_with_table(table, row)
+
+
+def test_stale_table_ignored(artifacts, tmp_path):
+    model, scaler, feature_names, scaled_features_list = artifacts
+    w, b = effective_coefficients(model, scaler, feature_names, scaled_features_list)
+    compile_table(w, b, feature_names, tmp_path)
+    assert load_table(w * 1.1, b, feature_names, tmp_path) is None
+
+
+def test_legacy_or_incomplete_table_ignored(artifacts, tmp_path):
+    model, scaler, feature_names, scaled_features_list = artifacts
+    w, b = effective_coefficients(model, scaler, feature_names, scaled_features_list)
+    compile_table(w, b, feature_names, tmp_path)
+    # File sub-tabel hilang -> dianggap basi, bukan error
+    (tmp_path / "ord_score.npy").unlink()
+    assert load_table(w, b, feature_names, tmp_path) is None
+    # Tabel format lama (meta.json tanpa "format") -> dianggap basi
+    compile_table(w, b, feature_names, tmp_path)
+    meta = json.loads((tmp_path / "meta.json").read_text())
+    del meta["format"]
+    (tmp_path / "meta.json").write_text(json.dumps(meta))
+    assert load_table(w, b, feature_names, tmp_path) is None
@@ -0,0 +1,234 @@
+"""Tuning offline: regularisasi model, batas kategori risiko, dan floor guardrail.
+
+    python tune_thresholds.py --workers 8            # threshold untuk model produksi (C saat ini)
+    python tune_thresholds.py --workers 8 --refit    # threshold untuk C terbaik + simpan ulang model
+
+Tanpa --refit, threshold di-tune pada prob out-of-fold dengan C model produksi, agar
+thresholds.json selalu cocok dengan model yang benar-benar dipakai app.
+"""
+import argparse
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import log_loss
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+
+from scoring import (
+    DATASET_PATH, FEATURE_NAMES, SCALED_FEATURES, THRESHOLDS_PATH, RISK_LEVELS, DEFAULT_RISK_BANDS,
+    DEFAULT_GUARDRAIL_FLOORS, ATTENTION_BAND, valid_risk_bands, load_artifacts, guardrail_score, apply_guardrails, risk_band_index
+)
+
+C_GRID = [0.001, 0.01, 0.1, 1.0, 10.0]
+FLOOR_GRID = np.round(np.arange(0.01, 1.0, 0.01), 2)
+# Band tujuan tiap tier guardrail (skor 6 -> Sangat Tinggi, 4 -> Tinggi, 2 -> Sedang);
+# floor tier harus jatuh di band ini, kalau tidak guardrail kehilangan maknanya
+TIER_BANDS = {s: int(risk_band_index(p, DEFAULT_RISK_BANDS)) for s, p in DEFAULT_GUARDRAIL_FLOORS}
+# Sensitivitas minimum untuk "prob >= batas band k" (Rendah, Sedang, Tinggi, Sangat Tinggi)
+BAND_SENSITIVITY = [0.95, 0.85, 0.70, 0.50]
+
+
+def build_model(C):
+    # Sama dengan konfigurasi logreg_model.pkl
+    return LogisticRegression(C=C, class_weight="balanced", max_iter=1000, random_state=42)
+
+
+def build_cache(df, n_folds=5, seed=42):
+    # Split fold & matriks fitur ter-scale dibuat sekali, dipakai ulang semua kandidat
+    X = df[FEATURE_NAMES].to_numpy(dtype=float)
+    y = df["Diabetes_binary"].to_numpy(dtype=int)
+    scaled_idx = [FEATURE_NAMES.index(c) for c in SCALED_FEATURES]
+    folds = []
+    for train_idx, val_idx in StratifiedKFold(n_folds, shuffle=True, random_state=seed).split(X, y):
+        scaler = StandardScaler().fit(X[train_idx][:, scaled_idx])
+        X_scaled = X.copy()
+        X_scaled[:, scaled_idx] = scaler.transform(X[:, scaled_idx])
+        folds.append({
+            "train_idx": train_idx, "val_idx": val_idx,
+            "X_train": X_scaled[train_idx], "X_val": X_scaled[val_idx],
+        })
+    return {"y": y, "folds": folds, "risk_score": guardrail_score(df)}
+
+
+_worker_cache = None
+
+def _init_worker(cache):
+    global _worker_cache
+    _worker_cache = cache
+
+def _fit_fold(args):
+    C, k = args
+    fold = _worker_cache["folds"][k]
+    model = build_model(C).fit(fold["X_train"], _worker_cache["y"][fold["train_idx"]])
+    return model.predict_proba(fold["X_val"])[:, 1]
+
+
+def sensitivity_specificity(flag, y):
+    sens = (flag & (y == 1)).sum() / max((y == 1).sum(), 1)
+    spec = (~flag & (y == 0)).sum() / max((y == 0).sum(), 1)
+    return sens, spec
+
+
+def choose_floors(raw_prob, y, risk_score, bands, min_sensitivity):
+    """Pilih floor per tier guardrail: tiap floor wajib berada di band tujuannya (TIER_BANDS).
+
+    Di dalam batas itu dipilih kombinasi dengan Brier score out-of-fold terkecil yang
+    memenuhi sensitivitas minimum pada batas "perhatian medis" (awal band ATTENTION_BAND). Brier score terpisah per tier (tiap orang hanya kena
+    floor tier-nya), jadi cukup dihitung sekali per (tier, floor) lalu dijumlahkan.
+    """
+    score_tiers = sorted(TIER_BANDS, reverse=True)
+    upper = [None] + score_tiers[:-1]
+    tier_loss = []
+    for min_score, max_score in zip(score_tiers, upper):
+        in_tier = risk_score >= min_score
+        if max_score is not None:
+            in_tier &= risk_score < max_score
+        p, t = raw_prob[in_tier], y[in_tier]
+        tier_loss.append({f: ((np.maximum(p, f) - t) ** 2).sum() for f in floor_candidates(bands, TIER_BANDS[min_score])})
+
+    combos = sorted(
+        itertools.product(*[list(loss) for loss in tier_loss]),
+        key=lambda combo: sum(tier_loss[i][f] for i, f in enumerate(combo))
+    )
+    attention = bands[ATTENTION_BAND - 1]
+    for combo in combos:
+        floors = list(zip(score_tiers, combo))
+        final_prob = apply_guardrails(raw_prob, risk_score, floors)
+        if sensitivity_specificity(final_prob >= attention, y)[0] >= min_sensitivity:
+            return floors
+    # Sensitivitas tidak tercapai: pakai floor tertinggi di band masing-masing
+    return list(zip(score_tiers, [max(loss) for loss in tier_loss]))
+
+
+def floor_candidates(bands, band):
+    # Nilai FLOOR_GRID yang jatuh di band tujuan (risk_band_index pakai side="right")
+    lo = bands[band - 1] if band > 0 else 0.0
+    hi = bands[band] if band < len(bands) else 1.0
+    return [float(f) for f in FLOOR_GRID if lo <= f < hi] or [float(lo)]
+
+
+def choose_bands(final_prob, y, targets=BAND_SENSITIVITY):
+    # Batas band k = threshold tertinggi yang masih memenuhi sensitivitas target,
+    # dibulatkan ke grid 0.01..0.99 dan naik tegas (ValueError jika tidak mungkin)
+    bands = []
+    grid = np.round(np.arange(0.01, 1.0, 0.01), 2)
+    for target in targets:
+        ok = [t for t in grid if sensitivity_specificity(final_prob >= t, y)[0] >= target]
+        t = ok[-1] if ok else grid[0]
+        if bands:
+            t = max(t, bands[-1] + 0.01)
+        bands.append(round(min(float(t), float(grid[-1])), 2))
+    if not valid_risk_bands(bands):
+        raise ValueError(f"Batas band tidak bisa dibuat naik di bawah 1: {bands}")
+    return bands
+
+
+def band_report(final_prob, y, bands):
+    rows = []
+    band_idx = risk_band_index(final_prob, bands)
+    for k, (label, _, _) in enumerate(RISK_LEVELS):
+        in_band = band_idx == k
+        sens, spec = sensitivity_specificity(band_idx >= k, y)
+        rows.append({
+            "band": label,
+            "lower_bound": 0.0 if k == 0 else bands[k - 1],
+            "n": int(in_band.sum()),
+            "prevalence": float(y[in_band].mean()) if in_band.any() else 0.0,
+            "sensitivity": float(sens),
+            "specificity": float(spec),
+        })
+    return rows
+
+
+def tune(df, workers=1, n_folds=5, min_sensitivity=0.80, C=None):
+    """C: regularisasi model yang akan dipakai dengan threshold ini (None = C terbaik hasil CV)."""
+    cache = build_cache(df, n_folds)
+    y = cache["y"]
+    n_folds = len(cache["folds"])
+    c_grid = C_GRID if C is None or C in C_GRID else C_GRID + [C]
+
+    # 1) Regularisasi: out-of-fold probabilitas per (C, fold), paralel antar core
+    tasks = [(c, k) for c in c_grid for k in range(n_folds)]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache,)) as ex:
+            fold_probs = list(ex.map(_fit_fold, tasks))
+    else:
+        _init_worker(cache)
+        fold_probs = [_fit_fold(t) for t in tasks]
+    oof = {}
+    for (c, k), probs in zip(tasks, fold_probs):
+        oof.setdefault(c, np.zeros(len(y)))[cache["folds"][k]["val_idx"]] = probs
+    cv_loss = {c: log_loss(y, oof[c]) for c in c_grid}
+    best_C = min(cv_loss, key=cv_loss.get)
+    C = best_C if C is None else C
+    raw_prob = oof[C]
+
+    # 2) Batas band pada prob out-of-fold model
+    bands = choose_bands(raw_prob, y)
+
+    # 3) Floor guardrail, masing-masing di dalam band tujuannya
+    best_floors = choose_floors(raw_prob, y, cache["risk_score"], bands, min_sensitivity)
+    final_prob = apply_guardrails(raw_prob, cache["risk_score"], best_floors)
+    return {
+        "C": C,
+        "best_C": best_C,
+        "cv_log_loss": {str(c): float(v) for c, v in cv_loss.items()},
+        "risk_bands": bands,
+        "guardrail_floors": [[s, p] for s, p in best_floors],
+        "band_metrics": band_report(final_prob, y, bands),
+    }
+
+
+def refit(df, C):
+    X = df[FEATURE_NAMES].copy()
+    scaler = StandardScaler().fit(X[SCALED_FEATURES])
+    X[SCALED_FEATURES] = scaler.transform(X[SCALED_FEATURES])
+    model = build_model(C).fit(X, df["Diabetes_binary"].astype(int))
+    joblib.dump(model, "logreg_model.pkl")
+    joblib.dump(scaler, "scaler.pkl")
+    joblib.dump(FEATURE_NAMES, "feature_names.pkl")
+    joblib.dump(SCALED_FEATURES, "scaled_features_list.pkl")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validated tuning model & threshold risiko")
+    parser.add_argument("--data", default=DATASET_PATH)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--min-sensitivity", type=float, default=0.80)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", default=THRESHOLDS_PATH)
+    parser.add_argument("--refit", action="store_true", help="Latih ulang & simpan model dengan C terbaik")
+    args = parser.parse_args()
+
+    production_C = None
+    if not args.refit:
+        model = load_artifacts()[0]
+        if model is None:
+            raise SystemExit("Model produksi tidak ditemukan; jalankan dengan --refit.")
+        production_C = float(model.C)
+
+    df = pd.read_csv(args.data)
+    try:
+        result = tune(df, workers=args.workers, n_folds=args.folds, min_sensitivity=args.min_sensitivity, C=production_C)
+    except ValueError as e:
+        raise SystemExit(f"Tuning gagal, {args.output} tidak ditulis: {e}")
+    print(f"C terbaik (CV): {result['best_C']}, threshold di-tune untuk C = {result['C']}")
+    if result["best_C"] != result["C"]:
+        print("Model produksi bukan C terbaik; jalankan dengan --refit untuk mengganti model.")
+    print(f"Floor guardrail: {result['guardrail_floors']}")
+    print(pd.DataFrame(result["band_metrics"]).round(3).to_string(index=False))
+
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    if args.refit:
+        refit(df, result["C"])
+
+
+if __name__ == "__main__":
+    main()